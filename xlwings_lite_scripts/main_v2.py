@@ -65,9 +65,39 @@ Previous Changes (v2.2):
 - Used .resize() instead of .expand() for reliable table creation
 
 Author: AI Coding Assistant guided by Amar Harolikar
-Version: 3.2
+Version: 3.3
 Date: 2025-11-17
 
+Key Changes in v3.3:
+- assess_questions is now async: all enabled models are called concurrently per batch
+  through one shared httpx.AsyncClient (batch latency = slowest model, not the sum).
+
+New MASTER sheet settings (all optional; blank = default):
+- QUESTIONS_PER_CALL (default: blank -> BATCH_SIZE): questions packed into one LLM call
+- MAX_CALL_LATENCY (default: 0 = off): seconds; halves QUESTIONS_PER_CALL when p95 call
+  latency exceeds it
+- BATCH_MODE (default: inline): "inline" packs several questions per call, "single" sends
+  one question per call so a bad item fails alone
+- SAVE_RAW_RESPONSE (default: TRUE): keep the raw API response in API_METRICS
+- REQUEST_TIMEOUT (default: 120): read timeout in seconds per request attempt
+- MAX_RETRIES (default: 3): total attempts per call; timeouts, 429s and 5xx are retried
+  with jittered exponential backoff
+- MAX_CONCURRENCY (default: 8): batches in flight at once
+- RPM_LIMIT / TPM_LIMIT (default: 0 = off): client-side requests / tokens per minute per
+  model; set either to turn pacing on (the other falls back to a provider default)
+- RESUME (default: 0 = off): reuse successful results cached by an interrupted run in the
+  same session (lost when the add-in reloads)
+- OPENROUTER_API_KEY may hold several comma-separated keys; calls rotate across them and
+  a key that gets a 429 cools down for 60s
+
+Other v3.3 changes:
+- T_COST may add CACHE_READ / CACHE_WRITE price columns (per 1M tokens); without them
+  cached prompt tokens are priced at INPUT (upper bound)
+- Dashboard time metrics are summed API time (Total API Time, API Time per Question,
+  API Time per 100K Questions), not elapsed time, since batches run concurrently
+- Large outputs (LLM_JUDGE_INPUT, MANUAL_TEST_JSON) are split down column A in <=30K-char
+  cells; join them in order (the ExportJudgeJSONToFile macro does this)
+
 Key Changes in v3.2:
 - Dashboard now includes Max Tokens, Temperature, and Top P parameters.
 
@@ -82,11 +112,71 @@ import json
 from datetime import datetime
 from typing import Tuple, Optional, Dict, List, Any
 import time
-import re
+from itertools import groupby
 import os
+import sys
+import logging
+import hashlib
+import asyncio
+import random
+import traceback
+
+import httpx
 
 import numpy as np
 
+try:
+    import orjson  # C-accelerated JSON codec (in the Pyodide package list)
+except ImportError:
+    orjson = None
+
+try:
+    import tiktoken  # Exact token counts for the system prompt (in the Pyodide package list)
+except ImportError:
+    tiktoken = None
+
+# ==================== LOGGING ====================
+
+# Per-response parser diagnostics go through logging so their formatting is
+# skipped entirely unless DEBUG is enabled. INFO and above still reach the
+# xlwings Output Pane via stdout. Set to logging.DEBUG when troubleshooting.
+log = logging.getLogger(__name__)
+if not log.handlers:
+    _log_handler = logging.StreamHandler(sys.stdout)
+    _log_handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_log_handler)
+log.setLevel(logging.INFO)
+log.propagate = False
+
+def _json_loads(data):
+    """Parse JSON from str or bytes, using orjson when it is available."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    """Serialize to a compact JSON str, using orjson when it is available."""
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+
+def _json_dumps_indented(obj) -> str:
+    """Serialize to 2-space indented JSON, using orjson when available (numpy scalars from pandas rows included)."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _extract_json_array(content: str) -> Optional[str]:
+    """
+    Slice the JSON array body out of an LLM response, from the first '[' to the last ']'.
+    Any ```json fences or reasoning preamble fall outside it. Two fixed-character scans,
+    no regex (same span the old r'\[.*\]' DOTALL search matched, without backtracking).
+    """
+    start = content.find('[')
+    end = content.rfind(']')
+    if start == -1 or end < start:
+        return None
+    return content[start:end + 1]
+
 # ==================== MODEL NAME MAPPING ====================
 
 MODEL_DISPLAY_NAMES = {
@@ -120,12 +210,28 @@ MODEL_CONFIG = {
 # - User uploads their TXT file via VBA button which pastes content into A1
 # - File should contain user guidelines + separator + technical instructions
 # - See: docs/QUESTION_GUIDELINES_20251112.txt for template
+# - docs/PROMPTS/QUESTION_GUIDELINES_20261016_V5.txt asks for the compact array-of-arrays
+#   output format (fewer output tokens); parse_llm_batch_response accepts both formats
 
 def get_short_model_name(full_model_string: str) -> str:
     if '/' in full_model_string:
         return full_model_string.split('/')[-1]
     return full_model_string # Return as is if no slash
 
+def count_prompt_tokens(text: str) -> int:
+    """
+    Count tokens in the system prompt once per run.
+    Uses tiktoken's gpt-4o encoding when available; falls back to the ~4 chars/token estimate
+    (e.g. if tiktoken is missing or its encoding file cannot be downloaded).
+    """
+    if tiktoken:
+        try:
+            return len(tiktoken.encoding_for_model("gpt-4o").encode(text))
+        except Exception as e:
+            print(f"   ⚠️  tiktoken unavailable ({e}), estimating prompt tokens as chars / 4")
+    return round(len(text) / 4)
+
+
 def format_time_hms(seconds: float) -> str:
     """
     Format seconds into human-readable HH:MM:SS format
@@ -144,6 +250,10 @@ def format_time_hms(seconds: float) -> str:
 
 # ==================== CONFIGURATION LOADER ====================
 
+# Deletes spaces and underscores in a single pass when normalizing parameter names
+_NORM_TABLE = str.maketrans('', '', ' _')
+
+
 def find_config_value(sheet: xw.Sheet, param_name: str, column: str = 'C', default_value=None):
     """
     Search for a parameter name in column A and return corresponding value from a specified column.
@@ -162,14 +272,14 @@ def find_config_value(sheet: xw.Sheet, param_name: str, column: str = 'C', defau
         param_names = sheet.range('A1:A50').value
 
         # Normalize search term
-        search_term = param_name.lower().replace('_', '').replace(' ', '')
+        search_term = param_name.lower().translate(_NORM_TABLE)
 
         for idx, cell_value in enumerate(param_names, start=1):
             if cell_value is None:
                 continue
 
             # Normalize cell value
-            cell_normalized = str(cell_value).lower().replace('_', '').replace(' ', '')
+            cell_normalized = str(cell_value).lower().translate(_NORM_TABLE)
 
             if search_term in cell_normalized:
                 # Found it! Get corresponding value from the specified column
@@ -189,6 +299,13 @@ def find_config_value(sheet: xw.Sheet, param_name: str, column: str = 'C', defau
         return default_value
 
 
+def _config_flag(value, default: bool) -> bool:
+    """Interpret a MASTER sheet TRUE/FALSE (or 1/0, YES/NO) cell; blank means default"""
+    if value is None or str(value).strip() == '':
+        return default
+    return str(value).strip().upper() in ("TRUE", "1", "1.0", "YES")
+
+
 def load_config(book: xw.Book) -> Dict:
     """Load configuration from environment variables and MASTER sheet with flexible parameter search"""
     print("📋 Loading configuration from environment variables and MASTER sheet...")
@@ -217,9 +334,19 @@ def load_config(book: xw.Book) -> Dict:
             "top_p": float(find_config_value(master_sheet, "TOPP", default_value=0.9) or 0.9),
             "max_tokens": int(find_config_value(master_sheet, "MAX_TOKENS", default_value=2000) or 2000),
             "batch_size": int(find_config_value(master_sheet, "BATCH_SIZE", default_value=5) or 5),
+            "llm_batch_size": int(find_config_value(master_sheet, "QUESTIONS_PER_CALL", default_value=0) or 0),
+            "max_call_latency": float(find_config_value(master_sheet, "MAX_CALL_LATENCY", default_value=0) or 0),
+            "save_raw_response": _config_flag(find_config_value(master_sheet, "SAVE_RAW_RESPONSE", default_value=None), default=True),
+            "resume": _config_flag(find_config_value(master_sheet, "RESUME", default_value=None), default=False),
+            "batch_mode": str(find_config_value(master_sheet, "BATCH_MODE", default_value="inline") or "inline").strip().lower(),
             "start_row": int(find_config_value(master_sheet, "START_ROW", default_value=2) or 2),
             "end_row": int(end_row_val) if (end_row_val := find_config_value(master_sheet, "END_ROW", default_value=None)) is not None else None,
             "request_delay_seconds": float(find_config_value(master_sheet, "REQUEST_DELAY", default_value=0) or 0),
+            "request_timeout": float(find_config_value(master_sheet, "REQUEST_TIMEOUT", default_value=120) or 120),
+            "max_retries": max(1, int(find_config_value(master_sheet, "MAX_RETRIES", default_value=3) or 3)),
+            "max_concurrency": max(1, int(find_config_value(master_sheet, "MAX_CONCURRENCY", default_value=8) or 8)),
+            "rpm_limit": float(find_config_value(master_sheet, "RPM_LIMIT", default_value=0) or 0),
+            "tpm_limit": float(find_config_value(master_sheet, "TPM_LIMIT", default_value=0) or 0),
             "http_referer": str(find_config_value(master_sheet, "HTTP_REFERER", default_value="https://github.com") or "https://github.com"),
             "x_title": str(find_config_value(master_sheet, "X_TITLE", default_value="Question Quality Assessor") or "Question Quality Assessor"),
             # Thinking/Reasoning parameters (read directly from cell references)
@@ -235,19 +362,37 @@ def load_config(book: xw.Book) -> Dict:
         model_3_tag = find_config_value(master_sheet, "LLM 3", column='B', default_value=0)
         config['model_3_tag'] = 1 if str(model_3_tag).strip() == '1' else 0
 
+        # Questions per LLM call: starts at QUESTIONS_PER_CALL (e.g. 20) if set, else BATCH_SIZE
+        if config["llm_batch_size"] < 1:
+            config["llm_batch_size"] = config["batch_size"]
+
+        # BATCH_MODE: "inline" packs several questions into one prompt (default, cheapest);
+        # "single" sends one question per request so a bad item fails alone, not with its whole batch
+        if config["batch_mode"] not in ("inline", "single"):
+            print(f"⚠️  Unknown BATCH_MODE '{config['batch_mode']}', using 'inline'")
+            config["batch_mode"] = "inline"
+        if config["batch_mode"] == "single":
+            config["llm_batch_size"] = 1
+            config["max_call_latency"] = 0  # Nothing to tune at one question per call
+
         # Safety check: Ensure start_row is at least 2 (skip header)
         if config["start_row"] < 2:
             print(f"⚠️  START_ROW was {config['start_row']}, adjusting to 2 (header row)")
             config["start_row"] = 2
 
-        # Validate API key
-        if not config["api_key"] or config["api_key"] == "" or len(config["api_key"]) < 20:
-            print("⚠️  WARNING: OPENROUTER_API_KEY appears invalid! API calls will likely fail.")
-            print("   Key length:", len(config["api_key"]))
-        else:
-            # Show masked API key for verification (first 8 chars + last 4 chars)
-            masked_key = config["api_key"][:8] + "..." + config["api_key"][-4:] if len(config["api_key"]) > 12 else "***"
-            print(f"   API Key detected: {masked_key} (length: {len(config['api_key'])} chars)")
+        # OPENROUTER_API_KEY may hold several comma-separated keys; calls rotate across them
+        config["api_keys"] = [k.strip() for k in config["api_key"].split(',') if k.strip()] or [""]
+        config["key_router"] = KeyRouter(config["api_keys"])
+
+        # Validate API key(s)
+        for key_num, api_key in enumerate(config["api_keys"], start=1):
+            if not api_key or len(api_key) < 20:
+                print(f"⚠️  WARNING: OPENROUTER_API_KEY #{key_num} appears invalid! API calls will likely fail.")
+                print("   Key length:", len(api_key))
+            else:
+                # Show masked API key for verification (first 8 chars + last 4 chars)
+                masked_key = api_key[:8] + "..." + api_key[-4:] if len(api_key) > 12 else "***"
+                print(f"   API Key #{key_num} detected: {masked_key} (length: {len(api_key)} chars)")
 
         print(f"\n✅ Configuration loaded successfully:")
         print(f"   Model 1: {config['model_1']} (Enabled: {config['model_1_tag'] == 1})")
@@ -258,7 +403,17 @@ def load_config(book: xw.Book) -> Dict:
         print(f"   Top-P:               {config['top_p']}")
         print(f"   Max Tokens:          {config['max_tokens']}")
         print(f"   Batch Size:          {config['batch_size']}")
+        print(f"   Batch Mode:          {config['batch_mode']}")
+        print(f"   Questions per Call:  {config['llm_batch_size']} (auto-tune: {'p95 > ' + str(config['max_call_latency']) + 's' if config['max_call_latency'] > 0 else 'off'})")
         print(f"   Request Delay (s):   {config['request_delay_seconds']}")
+        print(f"   Request Timeout (s): {config['request_timeout']} (attempts: {config['max_retries']})")
+        print(f"   Max Concurrency:     {config['max_concurrency']}")
+        print(f"   Save Raw Response:   {config['save_raw_response']}")
+        print(f"   Resume Cache:        {'on' if config['resume'] else 'off'}")
+        if config['rpm_limit'] or config['tpm_limit']:
+            print(f"   RPM / TPM Limit:     {config['rpm_limit'] or 'provider default'} / {config['tpm_limit'] or 'provider default'}")
+        else:
+            print("   RPM / TPM Limit:     off (set RPM_LIMIT / TPM_LIMIT to pace requests)")
         print(f"   HTTP Referer:        {config['http_referer']}")
         print(f"   X-Title:             {config['x_title']}")
 
@@ -276,8 +431,17 @@ def load_config(book: xw.Book) -> Dict:
                 raise ValueError(f"❌ PROMPT sheet cell A1 content is TOO SHORT ({len(str(system_prompt))} chars). Expected complete instructions. Please upload your instruction file.")
 
             config["system_prompt"] = str(system_prompt).strip()
+            # Stable key so OpenAI routes every call with this prompt to the same prompt cache
+            config["prompt_cache_key"] = hashlib.blake2b(config["system_prompt"].encode()).hexdigest()[:32]
             print(f"   ✅ System prompt loaded successfully ({len(config['system_prompt'])} characters)")
 
+            # Some providers cap the request body size; the prompt is resent on every call
+            config["system_prompt_bytes"] = len(config["system_prompt"].encode())
+            config["system_prompt_tokens"] = count_prompt_tokens(config["system_prompt"])
+            print(f"   System prompt tokens: {config['system_prompt_tokens']:,}")
+            if config["system_prompt_bytes"] > 50_000:
+                print(f"   ⚠️  WARNING: System prompt is {config['system_prompt_bytes']:,} bytes (>50KB). Some providers may reject requests this large.")
+
             # Print preview
             print("-" * 20 + " PROMPT PREVIEW " + "-" * 20)
             print(str(system_prompt)[:300] + "...")
@@ -300,7 +464,6 @@ def load_config(book: xw.Book) -> Dict:
 
     except Exception as e:
         print(f"❌ Error loading configuration: {e}")
-        import traceback
         traceback.print_exc()
         raise
 
@@ -349,38 +512,302 @@ def find_table_in_workbook(book: xw.Book, table_name: str) -> Tuple[Optional[Any
     return None, None
 
 
+def index_sheets(book: xw.Book) -> Dict[str, Any]:
+    """Map sheet name -> sheet in one pass over book.sheets; scripts build it once and reuse it"""
+    return {s.name: s for s in book.sheets}
+
+
+def ensure_sheet(book: xw.Book, name: str, sheets_by_name: Dict[str, Any], clear: bool = True) -> Any:
+    """Return the named sheet (cleared by default), adding it if missing and recording it in sheets_by_name"""
+    sheet = sheets_by_name.get(name)
+    if sheet is None:
+        sheet = book.sheets.add(name)
+        sheets_by_name[name] = sheet
+    elif clear:
+        sheet.clear()
+    return sheet
+
+
+# ==================== RATE LIMITING ====================
+
+# Client-side pacing is opt-in: a RateLimiter is only created when RPM_LIMIT and/or TPM_LIMIT
+# is set in the MASTER sheet (otherwise 429s are handled by retry backoff and key cooldown).
+# When only one is set, the other comes from these per-provider defaults (requests and
+# tokens per minute), which describe direct provider tiers rather than OpenRouter.
+PROVIDER_RATE_LIMITS = {
+    'openai': {'rpm': 60, 'tpm': 150_000},
+    'anthropic': {'rpm': 50, 'tpm': 80_000},
+    'google': {'rpm': 60, 'tpm': 100_000}
+}
+DEFAULT_RATE_LIMIT = {'rpm': 60, 'tpm': 100_000}
+
+
+class RateLimiter:
+    """
+    Proactive RPM + TPM token buckets for one model.
+
+    Calls wait in acquire() until both buckets have room, so requests are paced
+    under the provider limit instead of being sent, rejected with 429 and retried.
+    On a 429 the limits are halved; each success adds back a little (AIMD).
+    Token charges are estimates; refund() returns the unused part once real usage is known.
+    """
+
+    def __init__(self, rpm: float, tpm: float):
+        self.max_rpm = self.rpm = float(rpm)
+        self.max_tpm = self.tpm = float(tpm)
+        self.request_budget = self.rpm
+        self.token_budget = self.tpm
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.request_budget = min(self.rpm, self.request_budget + elapsed * self.rpm / 60)
+        self.token_budget = min(self.tpm, self.token_budget + elapsed * self.tpm / 60)
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Wait until one request of ~estimated_tokens fits in both buckets, then take it (returns tokens charged)"""
+        while True:
+            async with self._lock:
+                self._refill()
+                # A single request larger than the whole TPM bucket must still be let through eventually.
+                # Clamped on every pass: a 429 may have halved tpm while this call was waiting.
+                tokens = min(estimated_tokens, self.tpm)
+                if self.request_budget >= 1 and self.token_budget >= tokens:
+                    self.request_budget -= 1
+                    self.token_budget -= tokens
+                    return tokens
+                wait_seconds = max(
+                    (1 - self.request_budget) * 60 / self.rpm,
+                    (tokens - self.token_budget) * 60 / self.tpm,
+                    0.05
+                )
+            # Sleep outside the lock so other calls for this model can re-check the buckets meanwhile
+            await asyncio.sleep(wait_seconds)
+
+    def refund(self, charged_tokens: float, used_tokens: float):
+        """Give back the part of a charged estimate the request did not actually use"""
+        if used_tokens < charged_tokens:
+            self.token_budget = min(self.tpm, self.token_budget + charged_tokens - used_tokens)
+
+    def on_rate_limited(self):
+        """Multiplicative decrease after a 429"""
+        self.rpm = max(1.0, self.rpm / 2)
+        self.tpm = max(1_000.0, self.tpm / 2)
+        self.request_budget = min(self.request_budget, self.rpm)
+        self.token_budget = min(self.token_budget, self.tpm)
+        print(f"   🚦 Rate limited - reducing to {self.rpm:.0f} RPM / {self.tpm:,.0f} TPM")
+
+    def on_success(self):
+        """Additive increase back towards the configured ceiling"""
+        self.rpm = min(self.max_rpm, self.rpm + 1)
+        self.tpm = min(self.max_tpm, self.tpm + self.max_tpm / self.max_rpm)
+
+
+class KeyRouter:
+    """
+    Round-robin over the OpenRouter API keys. Rate limits apply per key, so N keys
+    give roughly N x the request rate. A key that gets a 429 sits out for a cooldown.
+    """
+
+    def __init__(self, keys: List[str], cooldown_seconds: float = 60):
+        self.keys = list(keys)
+        self.i = -1
+        self.cooldown_seconds = cooldown_seconds
+        self.cooldown_until = {}
+        self.rate_limited_counts = {k: 0 for k in self.keys}
+
+    def next(self) -> str:
+        """Next key in rotation that is not cooling down (or the one that frees up soonest)"""
+        now = time.monotonic()
+        for _ in range(len(self.keys)):
+            self.i = (self.i + 1) % len(self.keys)
+            key = self.keys[self.i]
+            if self.cooldown_until.get(key, 0) <= now:
+                return key
+        return min(self.keys, key=lambda k: self.cooldown_until.get(k, 0))
+
+    def report_rate_limited(self, key: str):
+        """Count a 429 for this key and rest it for the cooldown period"""
+        self.rate_limited_counts[key] = self.rate_limited_counts.get(key, 0) + 1
+        if len(self.keys) > 1:
+            self.cooldown_until[key] = time.monotonic() + self.cooldown_seconds
+            print(f"   🔑 API key #{self.keys.index(key) + 1} rate limited ({self.rate_limited_counts[key]}x), cooling down {self.cooldown_seconds:.0f}s")
+
+
+def _rate_limits_for(full_model_name: str, config: Dict) -> Optional[Dict]:
+    """MASTER sheet RPM/TPM limits for a model (provider default for the unset one), or None if neither is set"""
+    if not (config.get('rpm_limit') or config.get('tpm_limit')):
+        return None
+    provider = full_model_name.split('/')[0].lower()
+    limits = dict(PROVIDER_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMIT))
+    # Request limits are per key, so the default RPM scales with the key pool
+    limits['rpm'] *= len(config.get('api_keys') or [None])
+    if config.get('rpm_limit'):
+        limits['rpm'] = config['rpm_limit']
+    if config.get('tpm_limit'):
+        limits['tpm'] = config['tpm_limit']
+    return limits
+
+
+# ==================== MODEL RESOLUTION ====================
+
+def _thinking_params(full_model_name: str, is_thinking: bool, valid_efforts: Tuple[str, ...], config: Dict) -> Dict:
+    """
+    Build the thinking/reasoning request parameters for one model from the MASTER sheet settings.
+
+    Runs once per model per run, so validation errors (e.g. an unsupported
+    reasoning_effort) stop the run before any API call is made.
+
+    Returns:
+        Dict merged into every request payload for the model (empty if none apply)
+    """
+    params = {}
+    if not is_thinking:
+        return params
+
+    # Handle Gemini Models
+    if full_model_name.startswith('google/'):
+        budget_val = config.get('thinking_budget_gemini')
+
+        # If cell is blank or None, budget is 0 (off)
+        if budget_val is None or str(budget_val).strip() == '':
+            budget = 0
+        else:
+            budget = int(budget_val)
+
+        # Apply clamping/capping logic only for positive budgets
+        if budget > 0:
+            is_pro = 'pro' in full_model_name.lower()
+            min_val = 128 if is_pro else 512
+            max_val = 32768 if is_pro else 24576
+
+            if budget < min_val:
+                print(f"   🧠 Gemini budget was {budget}, bumping up to minimum of {min_val}")
+                budget = min_val
+            elif budget > max_val:
+                print(f"   🧠 Gemini budget was {budget}, capping at maximum of {max_val}")
+                budget = max_val
+        
+        # Only add the parameter if the budget is not 0
+        if budget != 0:
+            params['thinking_budget'] = budget
+            print(f"   🧠 Applying Gemini thinking_budget: {budget}")
+
+    # Handle OpenAI Models
+    elif full_model_name.startswith('openai/'):
+        user_effort = config.get('reasoning_effort_openai')
+
+        # Only proceed if the user has entered a value.
+        # If the cell is blank, we send no parameter, letting the API use its default.
+        if user_effort and user_effort.strip():
+            # User provided a value, so we must validate it.
+            # Check if the model is supposed to have reasoning effort values defined in T_COST.
+            if not valid_efforts:
+                 raise ValueError(f"Model '{full_model_name}' does not support the 'reasoning_effort' parameter, but a value was provided. Please clear cell C27 in the MASTER sheet.")
+
+            if user_effort not in valid_efforts:
+                raise ValueError(f"Invalid reasoning_effort '{user_effort}' for model '{full_model_name}'. Supported values are: {list(valid_efforts)}")
+
+            # If validation passes, add it to the payload.
+            params['reasoning_effort'] = user_effort
+            print(f"   🧠 Applying OpenAI reasoning_effort: {user_effort}")
+
+    return params
+
+
+def resolve_model_configs(config: Dict, thinking_models_lookup: Dict, thinking_values_lookup: Dict) -> List[Dict]:
+    """
+    Resolve the enabled models into plain per-model configs, once per run.
+
+    The T_COST lookups are collapsed into scalars here so the API hot path
+    does not repeat the dict lookups and string splitting on every call.
+
+    Returns:
+        List of dicts: {'key', 'name', 'display', 'short_name', 'is_thinking', 'thinking_params', 'limiter'}
+        ('limiter' is None unless RPM_LIMIT / TPM_LIMIT is configured)
+    """
+    models = []
+    limiters = {}  # One RateLimiter per full model name
+    for model_key in ['model_1', 'model_2', 'model_3']:
+        if config.get(f'{model_key}_tag') != 1:
+            continue
+
+        full_model_name = config[model_key]
+        valid_efforts_str = thinking_values_lookup.get(full_model_name) or ''
+        is_thinking = thinking_models_lookup.get(full_model_name) == 1
+        valid_efforts = tuple(v.strip() for v in str(valid_efforts_str).split(',') if v.strip())
+        limits = _rate_limits_for(full_model_name, config)
+
+        models.append({
+            'key': model_key,
+            'name': full_model_name,
+            'display': MODEL_DISPLAY_NAMES.get(model_key, model_key),
+            'short_name': get_short_model_name(full_model_name),  # Model label in ASSESSMENT_RESULTS
+            'is_thinking': is_thinking,
+            'thinking_params': _thinking_params(full_model_name, is_thinking, valid_efforts, config),
+            'limiter': limiters.setdefault(full_model_name, RateLimiter(**limits)) if limits else None
+        })
+    return models
+
+
 # ==================== OPENROUTER API CLIENT ====================
 
-def call_openrouter_api(
-    model_name: str,
+# One AsyncClient shared by all batches and models so kept-alive connections are reused
+# instead of paying TCP/TLS setup per call. Each request replaces only the read limit with
+# its own timeout; the connect, write and pool limits below always apply.
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_TIMEOUT = httpx.Timeout(connect=10, read=120, write=30, pool=None)
+_CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use (or after it was closed)"""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        _ASYNC_CLIENT = httpx.AsyncClient(timeout=_CLIENT_TIMEOUT, limits=_CLIENT_LIMITS)
+    return _ASYNC_CLIENT
+
+
+async def _close_async_client() -> None:
+    """Close the shared AsyncClient at the end of a run; the next call creates a fresh one"""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None and not _ASYNC_CLIENT.is_closed:
+        await _ASYNC_CLIENT.aclose()
+    _ASYNC_CLIENT = None
+
+
+async def call_openrouter_api_async(
+    model_cfg: Dict,
     messages: List[Dict],
     config: Dict,
-    thinking_models_lookup: Dict,
-    thinking_values_lookup: Dict,
-    timeout: int = 30,
+    timeout: Optional[float] = None,
     batch_num: int = 1
 ) -> Tuple[Optional[Dict], Optional[str], float]:
     """
     Call OpenRouter API with specified model
 
     Args:
-        model_name: Full model name (e.g., "google/gemini-2.5-flash-lite")
+        model_cfg: Resolved model config from resolve_model_configs()
         messages: List of message dicts with role and content
         config: Configuration dictionary
-        thinking_models_lookup: Dictionary mapping model names to thinking capability (1 or 0)
-        thinking_values_lookup: Dictionary mapping model names to valid reasoning effort strings.
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds per attempt (default: REQUEST_TIMEOUT from config)
         batch_num: Batch number (1-indexed) - enables detailed logging for batch #1
 
     Returns:
         (response_dict, error_message, latency_seconds)
     """
-    import requests
-
+    model_name = model_cfg['name']
+    timeout = timeout or config.get('request_timeout', 120)
+    request_timeout = httpx.Timeout(timeout, connect=_CLIENT_TIMEOUT.connect, write=_CLIENT_TIMEOUT.write, pool=_CLIENT_TIMEOUT.pool)
     url = "https://openrouter.ai/api/v1/chat/completions"
+    key_router = config.get('key_router')
+    api_key = key_router.next() if key_router else config['api_key']
 
     headers = {
-        "Authorization": f"Bearer {config['api_key']}",
+        "Authorization": f"Bearer {api_key}",
         "HTTP-Referer": config['http_referer'],
         "X-Title": config['x_title'],
         "Content-Type": "application/json"
@@ -394,152 +821,159 @@ def call_openrouter_api(
         "max_tokens": config['max_tokens']
     }
 
-    # Add thinking/reasoning parameters based on model type and config
-    is_thinking_model = thinking_models_lookup.get(model_name) == 1
-
-    if is_thinking_model:
-        # Handle Gemini Models
-        if model_name.startswith('google/'):
-            budget_val = config.get('thinking_budget_gemini')
-
-            # If cell is blank or None, budget is 0 (off)
-            if budget_val is None or str(budget_val).strip() == '':
-                budget = 0
-            else:
-                budget = int(budget_val)
-
-            # Apply clamping/capping logic only for positive budgets
-            if budget > 0:
-                is_pro = 'pro' in model_name.lower()
-                min_val = 128 if is_pro else 512
-                max_val = 32768 if is_pro else 24576
-
-                if budget < min_val:
-                    print(f"   🧠 Gemini budget was {budget}, bumping up to minimum of {min_val}")
-                    budget = min_val
-                elif budget > max_val:
-                    print(f"   🧠 Gemini budget was {budget}, capping at maximum of {max_val}")
-                    budget = max_val
-            
-            # Only add the parameter if the budget is not 0
-            if budget != 0:
-                payload['thinking_budget'] = budget
-                print(f"   🧠 Applying Gemini thinking_budget: {budget}")
-
-        # Handle OpenAI Models
-        elif model_name.startswith('openai/'):
-            user_effort = config.get('reasoning_effort_openai')
-
-            # Only proceed if the user has entered a value.
-            # If the cell is blank, we send no parameter, letting the API use its default.
-            if user_effort and user_effort.strip():
-                # User provided a value, so we must validate it.
-                valid_efforts_str = thinking_values_lookup.get(model_name)
-
-                # Check if the model is supposed to have reasoning effort values defined in T_COST.
-                if not valid_efforts_str or not str(valid_efforts_str).strip():
-                     raise ValueError(f"Model '{model_name}' does not support the 'reasoning_effort' parameter, but a value was provided. Please clear cell C27 in the MASTER sheet.")
-
-                valid_efforts = [v.strip() for v in str(valid_efforts_str).split(',')]
-
-                if user_effort not in valid_efforts:
-                    raise ValueError(f"Invalid reasoning_effort '{user_effort}' for model '{model_name}'. Supported values are: {valid_efforts}")
-
-                # If validation passes, add it to the payload.
-                payload['reasoning_effort'] = user_effort
-                print(f"   🧠 Applying OpenAI reasoning_effort: {user_effort}")
-
-    # DETAILED LOGGING FOR BATCH #1 ONLY
-    if batch_num == 1:
-        print("\n" + "="*80)
-        print("🔍 DETAILED API REQUEST LOG - BATCH #1 ONLY")
-        print("="*80)
-        print("\n📋 MODEL CONFIGURATION:")
-        print(f"   Model: {model_name}")
-        print(f"   Temperature: {config['temperature']}")
-        print(f"   Top-P: {config['top_p']}")
-        print(f"   Max Tokens: {config['max_tokens']}")
+    # Prompt caching: the system prompt is identical on every call, so let the provider cache it.
+    # Anthropic needs an explicit cache_control breakpoint, OpenAI takes a routing key,
+    # Gemini caches implicitly (no change needed).
+    if model_name.startswith('anthropic/') and messages and messages[0]['role'] == 'system':
+        payload['messages'] = [{
+            "role": "system",
+            "content": [{"type": "text", "text": messages[0]['content'], "cache_control": {"type": "ephemeral"}}]
+        }] + messages[1:]
+    elif model_name.startswith('openai/') and config.get('prompt_cache_key'):
+        payload['prompt_cache_key'] = config['prompt_cache_key']
+
+    # Thinking/reasoning parameters were resolved and validated once in resolve_model_configs()
+    payload.update(model_cfg['thinking_params'])
+
+    # DETAILED LOGGING FOR BATCH #1 ONLY (DEBUG level: nothing below is formatted otherwise)
+    if batch_num == 1 and log.isEnabledFor(logging.DEBUG):
+        log.debug("\n" + "="*80)
+        log.debug("🔍 DETAILED API REQUEST LOG - BATCH #1 ONLY")
+        log.debug("="*80)
+        log.debug("\n📋 MODEL CONFIGURATION:")
+        log.debug(f"   Model: {model_name}")
+        log.debug(f"   Temperature: {config['temperature']}")
+        log.debug(f"   Top-P: {config['top_p']}")
+        log.debug(f"   Max Tokens: {config['max_tokens']}")
         
         # Updated logging for thinking parameters
         if 'thinking_budget' in payload:
-            print(f"   Thinking Budget (Gemini): {payload['thinking_budget']}")
+            log.debug(f"   Thinking Budget (Gemini): {payload['thinking_budget']}")
         elif 'reasoning_effort' in payload:
-            print(f"   Reasoning Effort (OpenAI): {payload['reasoning_effort']}")
+            log.debug(f"   Reasoning Effort (OpenAI): {payload['reasoning_effort']}")
         else:
-            print("   Thinking/Reasoning: Off")
+            log.debug("   Thinking/Reasoning: Off")
 
-        print("\n📝 SYSTEM PROMPT (First 500 chars):")
-        print("-" * 80)
+        log.debug("\n📝 SYSTEM PROMPT (First 500 chars):")
+        log.debug("-" * 80)
         system_content = messages[0]['content'] if messages and messages[0]['role'] == 'system' else 'N/A'
-        print(system_content[:500])
-        print("..." if len(system_content) > 500 else "")
-        print(f"\n[Total System Prompt Length: {len(system_content)} characters]")
+        log.debug(system_content[:500])
+        log.debug("..." if len(system_content) > 500 else "")
+        log.debug(f"\n[Total System Prompt Length: {len(system_content)} characters]")
 
-        print("\n📦 USER PAYLOAD (Questions JSON - First 1000 chars):")
-        print("-" * 80)
+        log.debug("\n📦 USER PAYLOAD (Questions JSON - First 1000 chars):")
+        log.debug("-" * 80)
         user_content = messages[1]['content'] if len(messages) > 1 and messages[1]['role'] == 'user' else 'N/A'
-        print(user_content[:1000])
-        print("..." if len(user_content) > 1000 else "")
-        print(f"\n[Total User Payload Length: {len(user_content)} characters]")
-
-        print("\n🌐 FULL API PAYLOAD (Complete JSON):")
-        print("-" * 80)
-        print(json.dumps(payload, indent=2))
-        print("\n" + "="*80)
-        print("🚀 SENDING REQUEST TO OPENROUTER...")
-        print("="*80 + "\n")
+        log.debug(user_content[:1000])
+        log.debug("..." if len(user_content) > 1000 else "")
+        log.debug(f"\n[Total User Payload Length: {len(user_content)} characters]")
+
+        log.debug("\n🌐 FULL API PAYLOAD (Complete JSON):")
+        log.debug("-" * 80)
+        log.debug(json.dumps(payload, indent=2))
+        log.debug("\n" + "="*80)
+        log.debug("🚀 SENDING REQUEST TO OPENROUTER...")
+        log.debug("="*80 + "\n")
+
+    # Wait for room under this model's RPM/TPM limits (estimate: ~4 chars per token + max output)
+    estimated_tokens = sum(len(str(m['content'])) for m in messages) // 4 + payload['max_tokens']
+    limiter = model_cfg.get('limiter')
+    max_attempts = max(1, int(config.get('max_retries', 3)))
 
     # Minimal logging for production (200K+ records)
     start_time = time.time()
+    limiter_wait = 0.0  # Time queued in the rate limiter, excluded from the reported latency
+
+    # Timeouts, 429s and 5xx are retried with jittered exponential backoff (1s..30s), each
+    # attempt on the next API key. Latency covers all POST attempts and their backoff, but
+    # not limiter waits: it feeds batch-size auto-tuning, which should not react to pacing.
+    for attempt in range(1, max_attempts + 1):
+        if key_router and attempt > 1:
+            api_key = key_router.next()
+            headers["Authorization"] = f"Bearer {api_key}"
+        if limiter:
+            wait_start = time.time()
+            charged_tokens = await limiter.acquire(estimated_tokens)
+            limiter_wait += time.time() - wait_start
 
-    try:
-        response = requests.post(
-            url,
-            headers=headers,
-            json=payload,
-            timeout=timeout
-        )
+        try:
+            response = await _get_async_client().post(
+                url,
+                headers=headers,
+                json=payload,
+                timeout=request_timeout
+            )
+        except httpx.TransportError as e:
+            if limiter:
+                limiter.refund(charged_tokens, 0)  # No response: don't let an outage drain the TPM bucket
+            if attempt < max_attempts:
+                backoff = random.uniform(1, min(30, 2 ** attempt))
+                print(f"   🔁 {model_name}: {'Timeout' if isinstance(e, httpx.TimeoutException) else 'Connection error'}, retry {attempt}/{max_attempts - 1} in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                continue
+            latency = time.time() - start_time - limiter_wait
+            if isinstance(e, httpx.TimeoutException):
+                return None, f"Timeout after {timeout}s ({max_attempts} attempts)", latency
+            return None, str(e), latency
+        except Exception as e:
+            latency = time.time() - start_time - limiter_wait
+            error_msg = str(e)
+            return None, error_msg, latency
 
-        latency = time.time() - start_time
+        if response.status_code == 429 and key_router:
+            key_router.report_rate_limited(api_key)
+
+        if limiter:
+            if response.status_code == 429:
+                limiter.on_rate_limited()
+            elif response.status_code == 200:
+                limiter.on_success()
+            if response.status_code != 200:
+                limiter.refund(charged_tokens, 0)  # Rejected or failed: nothing was generated
+
+        if (response.status_code == 429 or response.status_code >= 500) and attempt < max_attempts:
+            backoff = random.uniform(1, min(30, 2 ** attempt))
+            print(f"   🔁 {model_name}: HTTP {response.status_code}, retry {attempt}/{max_attempts - 1} in {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+            continue
+        break
 
-        if response.status_code == 200:
-            # Check if response is empty
-            if not response.text or response.text.strip() == "":
-                error_msg = f"Empty response from OpenRouter"
-                return None, error_msg, latency
-
-            try:
-                response_json = response.json()
-                return response_json, None, latency
-            except json.JSONDecodeError as je:
-                error_msg = f"Invalid JSON response: {str(je)}"
-                return None, error_msg, latency
-        else:
-            # Enhanced error reporting for non-200 status codes
-            error_msg = f"HTTP {response.status_code}"
-            try:
-                error_detail = response.json()
-                if 'error' in error_detail:
-                    error_msg += f" - {error_detail['error']}"
-            except:
-                # If response is not JSON, try to get text
-                if response.text:
-                    error_msg += f" - {response.text[:200]}"
-
-            # Special handling for 401 errors
-            if response.status_code == 401:
-                error_msg += " (AUTHENTICATION FAILED - Check your OPENROUTER_API_KEY in MASTER sheet)"
+    latency = time.time() - start_time - limiter_wait
 
+    if response.status_code == 200:
+        # Check if response is empty (on raw bytes - isspace() scans without copying the body like strip())
+        body = response.content
+        if not body or body.isspace():
+            error_msg = f"Empty response from OpenRouter"
             return None, error_msg, latency
 
-    except requests.exceptions.Timeout:
-        latency = time.time() - start_time
-        error_msg = f"Timeout after {timeout}s"
-        return None, error_msg, latency
+        try:
+            # Parse the raw UTF-8 bytes directly: no text decode or encoding detection pass
+            response_json = _json_loads(body)
+            # Replace the chars/4 + max_tokens estimate with what the call really used
+            used_tokens = (response_json.get('usage') or {}).get('total_tokens') if isinstance(response_json, dict) else None
+            if limiter and used_tokens is not None:
+                limiter.refund(charged_tokens, used_tokens)
+            return response_json, None, latency
+        except ValueError as je:
+            error_msg = f"Invalid JSON response: {str(je)}"
+            return None, error_msg, latency
+    else:
+        # Enhanced error reporting for non-200 status codes
+        error_msg = f"HTTP {response.status_code}"
+        try:
+            error_detail = _json_loads(response.content)
+            if 'error' in error_detail:
+                error_msg += f" - {error_detail['error']}"
+        except:
+            # If response is not JSON, try to get text
+            if response.text:
+                error_msg += f" - {response.text[:200]}"
+
+        # Special handling for 401 errors
+        if response.status_code == 401:
+            error_msg += " (AUTHENTICATION FAILED - Check your OPENROUTER_API_KEY in MASTER sheet)"
 
-    except Exception as e:
-        latency = time.time() - start_time
-        error_msg = str(e)
         return None, error_msg, latency
 
 
@@ -559,48 +993,48 @@ def parse_llm_response(response: Dict, model_name: str = "Unknown") -> Optional[
     try:
         content = response["choices"][0]["message"]["content"]
 
-        print(f"   [DEBUG] {model_name} raw content length: {len(content)} chars")
-        print(f"   [DEBUG] {model_name} first 100 chars: {content[:100]}")
+        log.debug("   [DEBUG] %s raw content length: %d chars", model_name, len(content))
+        log.debug("   [DEBUG] %s first 100 chars: %s", model_name, content[:100])
 
         # Strip markdown code blocks if present
         content = content.strip()
         if content.startswith("```json"):
-            print(f"   [DEBUG] {model_name}: Found ```json block")
+            log.debug("   [DEBUG] %s: Found ```json block", model_name)
             content = content[7:]
         if content.startswith("```"):
-            print(f"   [DEBUG] {model_name}: Found ``` block")
+            log.debug("   [DEBUG] %s: Found ``` block", model_name)
             content = content[3:]
         if content.endswith("```"):
-            print(f"   [DEBUG] {model_name}: Removing trailing ```")
+            log.debug("   [DEBUG] %s: Removing trailing ```", model_name)
             content = content[:-3]
         content = content.strip()
 
-        print(f"   [DEBUG] {model_name} cleaned content length: {len(content)} chars")
+        log.debug("   [DEBUG] %s cleaned content length: %d chars", model_name, len(content))
 
         # Parse JSON
         try:
             parsed = json.loads(content)
-            print(f"   [DEBUG] {model_name}: JSON parsed successfully")
+            log.debug("   [DEBUG] %s: JSON parsed successfully", model_name)
         except json.JSONDecodeError as je:
-            print(f"   [DEBUG] {model_name}: JSON parse failed - {str(je)}")
-            print(f"   [DEBUG] {model_name}: Content that failed: {content[:200]}")
+            log.debug("   [DEBUG] %s: JSON parse failed - %s", model_name, je)
+            log.debug("   [DEBUG] %s: Content that failed: %s", model_name, content[:200])
             return None
 
         # Validate top-level structure
         required_keys = ["change_required", "feedback"]
         missing_keys = [k for k in required_keys if k not in parsed]
         if missing_keys:
-            print(f"   [DEBUG] {model_name}: Missing top-level keys: {missing_keys}")
+            log.debug("   [DEBUG] %s: Missing top-level keys: %s", model_name, missing_keys)
             return None
 
         # Ensure change_required is 0 or 1
         if parsed["change_required"] not in [0, 1]:
-            print(f"   [DEBUG] {model_name}: Invalid change_required value: {parsed['change_required']}")
+            log.debug("   [DEBUG] %s: Invalid change_required value: %s", model_name, parsed['change_required'])
             return None
         
         # Validate feedback structure (at least 'question' should be present) and ensure it's a dict
         if not isinstance(parsed['feedback'], dict) or 'question' not in parsed['feedback']:
-            print(f"   [DEBUG] {model_name}: Invalid or missing 'feedback' object.")
+            log.debug("   [DEBUG] %s: Invalid or missing 'feedback' object.", model_name)
             return None
 
         # User experience improvement: if no change is required, make it explicit per item.
@@ -614,16 +1048,56 @@ def parse_llm_response(response: Dict, model_name: str = "Unknown") -> Optional[
                 parsed['feedback'][item_key] = {"issue": "Invalid feedback format.", "rewrite": ""}
 
 
-        print(f"   [DEBUG] {model_name}: ✅ Valid JSON response")
+        log.debug("   [DEBUG] %s: ✅ Valid JSON response", model_name)
         return parsed
 
     except (KeyError, IndexError, json.JSONDecodeError) as e:
-        print(f"   [DEBUG] {model_name}: Exception during parsing - {str(e)}")
+        log.debug("   [DEBUG] %s: Exception during parsing - %s", model_name, e)
         return None
 
 
+async def preflight_check(config: Dict) -> None:
+    """
+    Send one tiny request before any batches run, so a bad API key or a prompt
+    the provider rejects stops the run immediately instead of failing every batch.
+
+    Uses the first enabled model with max_tokens=1 and no thinking parameters.
+    Raises RuntimeError only on HTTP 401/403 (bad key or permissions). A 400 only warns:
+    the probe's max_tokens=1 without thinking parameters can be rejected by models that
+    enforce a minimum (e.g. a reasoning budget) even though the real config is valid.
+    Timeouts, 429s, 5xx and other errors are likely transient and also only warn.
+    """
+    if not config.get('models'):
+        return
+
+    model_cfg = {**config['models'][0], 'is_thinking': False, 'thinking_params': {}}
+    print(f"🔌 Preflight check with {model_cfg['display']} ({model_cfg['name']})...")
+
+    messages = [
+        {"role": "system", "content": config['system_prompt']},
+        {"role": "user", "content": json.dumps([{"questionid": 0, "question": "Preflight check"}])}
+    ]
+    _, error, latency = await call_openrouter_api_async(model_cfg, messages, {**config, 'max_tokens': 1, 'max_retries': 1}, timeout=5, batch_num=0)
+
+    if error and error.startswith(('HTTP 401', 'HTTP 403')):
+        raise RuntimeError(f"Preflight check failed, aborting run: {error}")
+    elif error and error.startswith('HTTP 400'):
+        print(f"   ⚠️  Preflight request rejected (continuing - the probe's max_tokens=1 may be below the model's minimum): {error}")
+    elif error and error.startswith('Timeout'):
+        print(f"   ⚠️  Preflight timed out after {latency:.1f}s - continuing, but the provider may be slow.")
+    elif error:
+        print(f"   ⚠️  Preflight error (continuing, batches will retry): {error}")
+    else:
+        print(f"   ✅ Preflight OK ({latency:.2f}s)")
+
+
 # ==================== QUESTION PROCESSING ====================
 
+# Answer slots 1-5: source/LLM JSON keys and their ASSESSMENT_RESULTS column headers
+ANSWER_JSON_KEYS = tuple(f'answer{j}' for j in range(1, 6))
+ANSWER_DISPLAY_KEYS = tuple(f'Answer {j}' for j in range(1, 6))
+
+
 def _clean_text(text):
     if pd.isna(text):
         return ""
@@ -662,115 +1136,150 @@ def prepare_question_batch_payload(batch_df: pd.DataFrame) -> str:
         
         payload_list.append(question_obj)
 
-    return json.dumps(payload_list, indent=2)
+    return _json_dumps_indented(payload_list)
+
+
+def _qid_key(qid) -> str:
+    """Comparable form of a questionid: Excel reads 101 as 101.0, while the LLM may echo 101 or "101" """
+    if isinstance(qid, float) and qid.is_integer():
+        qid = int(qid)
+    return str(qid)
+
+
+def _inflate_compact_result(row: List) -> Optional[Dict]:
+    """
+    Re-inflate one compact result row into the standard feedback dict.
+
+    Compact:  [questionid, change_required, [[item, issue, rewrite], ...]]
+    Standard: {"questionid": ..., "change_required": ..., "feedback": {item: {"issue": ..., "rewrite": ...}}}
+
+    Returns None for a malformed row (wrong arity, change_required not 0/1, feedback not a
+    list of 3-item lists), so it is treated as a failed result rather than an empty success.
+    """
+    if len(row) != 3 or row[1] not in (0, 1) or not isinstance(row[2], list):
+        return None
+    if not all(isinstance(entry, list) and len(entry) == 3 for entry in row[2]):
+        return None
+
+    feedback = {
+        str(item): {'issue': issue or '', 'rewrite': rewrite or ''}
+        for item, issue, rewrite in row[2]
+    }
+    return {'questionid': row[0], 'change_required': int(row[1]), 'feedback': feedback}
 
 
-def parse_llm_batch_response(response: Dict, batch_df: pd.DataFrame) -> Tuple[Dict, str]:
+def parse_llm_batch_response(response: Dict, question_ids: List) -> Tuple[Dict, str]:
     """
     Parses the JSON array from the LLM's batched response.
     Returns a dictionary of results mapped by questionid and an error string.
+
+    Takes only plain Python data (response dict + list of expected questionids),
+    no DataFrame, so it stays cheap to call and safe to hand to an executor.
     """
     results_map = {}
     content = "" # Initialize content to avoid reference before assignment in except block
     try:
         content = response["choices"][0]["message"]["content"]
 
-        # Clean the response content
-        content = content.strip()
-
-        # Handle markdown code blocks
-        if content.startswith("```json"):
-            content = content[7:].strip()
-        elif content.startswith("```"):
-            content = content[3:].strip()
-        if content.endswith("```"):
-            content = content[:-3].strip()
-
-        # For reasoning models, extract JSON array from anywhere in the content
-        # Look for the first '[' and last ']' to extract just the JSON array
-        if not content.startswith('['):
-            print("   [INFO] Response doesn't start with '[', attempting to extract JSON array...")
-            start_idx = content.find('[')
-            if start_idx != -1:
-                end_idx = content.rfind(']')
-                if end_idx != -1:
-                    content = content[start_idx:end_idx+1]
-                    print(f"   [INFO] Extracted JSON array from position {start_idx} to {end_idx}")
+        # Extract the JSON array, skipping markdown fences and any reasoning text around it
+        json_array = _extract_json_array(content)
+        if json_array is None:
+            return {}, "No JSON array found in LLM response."
 
         # Parse the string into a Python list of feedback objects
-        parsed_array = json.loads(content)
+        parsed_array = _json_loads(json_array)
         
         if not isinstance(parsed_array, list):
             return {}, "LLM response was not a JSON array."
 
-        # Map results by questionid for reliable processing
+        # Map results by questionid for reliable processing. Returned ids are matched to the
+        # batch's own ids by _qid_key, so 101 / "101" / 101.0 all land on the same question.
+        expected_ids = {_qid_key(qid): qid for qid in question_ids}
         for item in parsed_array:
-            if 'questionid' in item:
-                results_map[item['questionid']] = item
+            # Compact array-of-arrays format (V5 prompt) -> standard dict format
+            if isinstance(item, list):
+                inflated = _inflate_compact_result(item)
+                if inflated is None:
+                    # Its question gets no result, so it is reported as missing (failed), not as a success
+                    log.warning("   [WARN] Found a malformed compact result row, it will be ignored: %s", str(item)[:200])
+                    continue
+                item = inflated
+            if isinstance(item, dict) and 'questionid' in item:
+                qid = expected_ids.get(_qid_key(item['questionid']), item['questionid'])
+                results_map[qid] = {**item, 'questionid': qid}
             else:
-                print("   [WARN] Found a result item without a questionid, it will be ignored.")
+                log.warning("   [WARN] Found a result item without a questionid, it will be ignored.")
 
         # Check if all original questionids were found in the response
-        original_ids = set(batch_df['questionid'])
+        original_ids = set(question_ids)
         returned_ids = set(results_map.keys())
         if original_ids != returned_ids:
-            print(f"   [WARN] Mismatch in returned questionids. Missing: {original_ids - returned_ids}")
+            log.warning("   [WARN] Mismatch in returned questionids. Missing: %s", original_ids - returned_ids)
 
         return results_map, None
 
     except (KeyError, IndexError, json.JSONDecodeError, TypeError) as e:
         error_msg = f"Failed to parse LLM batch response: {e}"
-        print(f"   [DEBUG] Content that failed parsing: {content[:500]}")
+        log.debug("   [DEBUG] Content that failed parsing: %s", content[:500])
         return {}, error_msg
 
 
-def assess_question_batch(batch_df: pd.DataFrame, config: Dict, thinking_models_lookup: Dict, thinking_values_lookup: Dict, batch_num: int = 1) -> Dict:
+async def assess_question_batch(batch_df: pd.DataFrame, config: Dict, batch_num: int = 1) -> Dict:
     """
     Assess a batch of questions with all enabled models.
+    All enabled models are called concurrently, so batch latency is the slowest model, not the sum.
     Returns a dictionary of dictionaries, keyed by questionid and then model_key.
     e.g., {3401: {'model_1': {...}, 'model_2': {...}}}
 
     Args:
         batch_df: DataFrame containing questions to assess
-        config: Configuration dictionary
-        thinking_models_lookup: Dictionary mapping model names to thinking capability (1 or 0)
-        thinking_values_lookup: Dictionary mapping model names to valid reasoning effort strings.
+        config: Configuration dictionary (with resolved config['models'])
         batch_num: Batch number (1-indexed) - used for detailed logging on first batch
     """
     # Use the complete system prompt loaded from PROMPT sheet
     system_prompt = config['system_prompt']
 
     question_payload = prepare_question_batch_payload(batch_df)
+    question_ids = batch_df['questionid'].tolist()
 
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": question_payload}
     ]
 
-    batch_results = {}
+    batch_results = {qid: {} for qid in question_ids}
 
-    for model_key in ['model_1', 'model_2', 'model_3']:
-        if config.get(f'{model_key}_tag') != 1:
-            continue
+    models = config['models']
+    for model_cfg in models:
+        print(f"   -> Assessing batch of {len(batch_df)} questions with {model_cfg['display']} ({model_cfg['name']})...")
 
-        full_model_name = config[model_key]  # e.g., "google/gemini-2.0-flash-lite"
-        model_display = MODEL_DISPLAY_NAMES.get(model_key, model_key)  # e.g., "Gemini" (for console logs only)
+    # Fire all enabled models at once and wait for all of them
+    call_results = await asyncio.gather(
+        *[call_openrouter_api_async(model_cfg, messages, config, batch_num=batch_num) for model_cfg in models],
+        return_exceptions=True
+    )
 
-        print(f"   -> Assessing batch of {len(batch_df)} questions with {model_display} ({full_model_name})...")
+    for model_cfg, call_result in zip(models, call_results):
+        model_key = model_cfg['key']
+        full_model_name = model_cfg['name']  # e.g., "google/gemini-2.0-flash-lite"
 
-        response, error, latency = call_openrouter_api(full_model_name, messages, config, thinking_models_lookup, thinking_values_lookup, batch_num=batch_num)
+        if isinstance(call_result, Exception):
+            response, error, latency = None, str(call_result), 0.0
+        else:
+            response, error, latency = call_result
 
         usage = response.get('usage', {}) if response else {}
 
-        # DETAILED DIAGNOSTICS FOR BATCH #1 ONLY
-        if batch_num == 1:
-            print("\n" + "="*80)
-            print("🔍 RAW API RESPONSE - USAGE OBJECT DIAGNOSTICS (BATCH #1 ONLY)")
-            print("="*80)
-            print(f"📊 Model: {full_model_name}")
-            print(f"\n📦 Full Usage Object:")
-            print(json.dumps(usage, indent=2))
-            print("\n🔎 Token Extraction Attempts:")
+        # DETAILED DIAGNOSTICS FOR BATCH #1 ONLY (DEBUG level: the usage dump is skipped otherwise)
+        debug_usage = batch_num == 1 and log.isEnabledFor(logging.DEBUG)
+        if debug_usage:
+            log.debug("\n" + "="*80)
+            log.debug("🔍 RAW API RESPONSE - USAGE OBJECT DIAGNOSTICS (BATCH #1 ONLY)")
+            log.debug("="*80)
+            log.debug(f"📊 Model: {full_model_name}")
+            log.debug(f"\n📦 Full Usage Object:")
+            log.debug(json.dumps(usage, indent=2))
+            log.debug("\n🔎 Token Extraction Attempts:")
 
         # Extract reasoning/thinking tokens (check multiple possible locations)
         reasoning_tokens = 0
@@ -778,33 +1287,40 @@ def assess_question_batch(batch_df: pd.DataFrame, config: Dict, thinking_models_
         # Check nested location: completion_tokens_details.reasoning_tokens (OpenAI format)
         completion_details = usage.get('completion_tokens_details', {})
         reasoning_tokens_nested = completion_details.get('reasoning_tokens', 0)
-        if batch_num == 1:
-            print(f"   1. completion_tokens_details.reasoning_tokens: {reasoning_tokens_nested}")
+        if debug_usage:
+            log.debug(f"   1. completion_tokens_details.reasoning_tokens: {reasoning_tokens_nested}")
         reasoning_tokens = reasoning_tokens_nested
 
         # Fallback: Check top-level reasoning_tokens
         reasoning_tokens_top = usage.get('reasoning_tokens', 0)
-        if batch_num == 1:
-            print(f"   2. usage.reasoning_tokens (top-level): {reasoning_tokens_top}")
+        if debug_usage:
+            log.debug(f"   2. usage.reasoning_tokens (top-level): {reasoning_tokens_top}")
         if reasoning_tokens == 0:
             reasoning_tokens = reasoning_tokens_top
 
         # Fallback: Check top-level thinking_tokens (Gemini format)
         thinking_tokens_top = usage.get('thinking_tokens', 0)
-        if batch_num == 1:
-            print(f"   3. usage.thinking_tokens (top-level): {thinking_tokens_top}")
+        if debug_usage:
+            log.debug(f"   3. usage.thinking_tokens (top-level): {thinking_tokens_top}")
         if reasoning_tokens == 0:
             reasoning_tokens = thinking_tokens_top
 
-        if batch_num == 1:
-            print(f"\n✅ Final Reasoning Tokens Value: {reasoning_tokens}")
-            print("="*80 + "\n")
+        if debug_usage:
+            log.debug(f"\n✅ Final Reasoning Tokens Value: {reasoning_tokens}")
+            log.debug("="*80 + "\n")
+
+        # Prompt cache usage (OpenRouter normalized fields first, then Anthropic-native names)
+        prompt_details = usage.get('prompt_tokens_details') or {}
+        cache_read_tokens = prompt_details.get('cached_tokens') or usage.get('cache_read_input_tokens') or 0
+        cache_write_tokens = prompt_details.get('cache_write_tokens') or usage.get('cache_creation_input_tokens') or 0
 
         tokens = {
             'input': usage.get('prompt_tokens', 0),
             'output': usage.get('completion_tokens', 0),
             'reasoning': reasoning_tokens,
-            'total': usage.get('total_tokens', 0)
+            'total': usage.get('total_tokens', 0),
+            'cache_read': cache_read_tokens,
+            'cache_write': cache_write_tokens
         }
 
         # Console log for reasoning token detection
@@ -814,43 +1330,172 @@ def assess_question_batch(batch_df: pd.DataFrame, config: Dict, thinking_models_
         # Common data for all questions in this batch for this model
         model_batch_info = {
             'model_key': model_key, 'model_name': full_model_name,  # Store FULL model name
-            'latency': latency, 'tokens': tokens, 'raw_response': json.dumps(response) if response else None
+            'latency': latency, 'tokens': tokens,
+            # Parsed dict, serialized only when written to API_METRICS (skipped if SAVE_RAW_RESPONSE is off)
+            'raw_response': response if config['save_raw_response'] else None
         }
 
         if error:
             print(f"      ❌ Batch failed. Error: {error}")
-            for qid in batch_df['questionid']:
-                batch_results.setdefault(qid, {})[model_key] = {'error': error, **model_batch_info}
+            for qid in question_ids:
+                batch_results[qid][model_key] = {'error': error, **model_batch_info}
             continue
 
-        parsed_results_map, parse_error = parse_llm_batch_response(response, batch_df)
+        parsed_results_map, parse_error = parse_llm_batch_response(response, question_ids)
 
         if parse_error:
             print(f"      ⚠️  Batch failed on parsing. Error: {parse_error}")
-            for qid in batch_df['questionid']:
-                batch_results.setdefault(qid, {})[model_key] = {'error': parse_error, **model_batch_info}
+            for qid in question_ids:
+                batch_results[qid][model_key] = {'error': parse_error, **model_batch_info}
             continue
 
         print(f"      ✅ Batch successful. Parsed {len(parsed_results_map)} results.")
         # Map the parsed results back to the original questions
-        for qid in batch_df['questionid']:
+        for qid in question_ids:
             result_for_qid = parsed_results_map.get(qid)
             if result_for_qid:
-                batch_results.setdefault(qid, {})[model_key] = {'error': None, **result_for_qid, **model_batch_info}
+                batch_results[qid][model_key] = {'error': None, **result_for_qid, **model_batch_info}
             else:
-                 batch_results.setdefault(qid, {})[model_key] = {'error': "Response missing for this questionid", **model_batch_info}
+                batch_results[qid][model_key] = {'error': "Response missing for this questionid", **model_batch_info}
 
     return batch_results
 
 
-# ==================== DASHBOARD HELPER (Not @script - callable from main) ====================
+def tune_llm_batch_size(current_size: int, batch_latencies: List[float], config: Dict) -> int:
+    """
+    Back off the number of questions per LLM call when calls get too slow.
 
-def build_and_write_dashboard(book: xw.Book, config: Dict, metrics_data: List[Dict], results_data: List[Dict], system_prompt_text: str):
+    Larger calls mean fewer round trips, but latency grows with the number of
+    questions. Once p95 latency over the recent calls exceeds MAX_CALL_LATENCY
+    (seconds), the size is halved and the latency window restarts.
+    Auto-tuning is off when MAX_CALL_LATENCY is 0 or blank.
     """
-    Builds and writes an enhanced dashboard with prompt cost analysis and metric descriptions.
+    max_latency = config.get('max_call_latency', 0)
+    if max_latency <= 0 or current_size <= 1 or len(batch_latencies) < 3:
+        return current_size
+
+    p95_latency = float(np.percentile(batch_latencies[-20:], 95))
+    if p95_latency <= max_latency:
+        return current_size
+
+    new_size = max(1, current_size // 2)
+    print(f"   ⏱️  p95 call latency {p95_latency:.1f}s > {max_latency}s, reducing questions per call {current_size} -> {new_size}")
+    batch_latencies.clear()
+    return new_size
+
+
+# ==================== RESUME CACHE ====================
+
+# Opt-in with RESUME = 1 in the MASTER sheet. Successful results are appended to a JSONL file
+# after every batch, so a run that fails on batch #47 can be re-run and only the remaining
+# questions are sent. xlwings Lite has no local file access, so the file lives in Pyodide's
+# in-memory filesystem: it survives re-runs in the same session, but not an add-in reload.
+# The file name covers everything that shapes a response besides the question itself (prompt,
+# models, sampling and thinking settings); each entry also carries a fingerprint of its question
+# row, so a question edited in T_QUESTIONS since the interrupted run is assessed again.
+RESUME_CACHE_DIR = '/tmp'
+RESUME_CACHE_PREFIX = 'qq_resume_'
+
+
+def resume_cache_path(config: Dict) -> str:
+    """Cache file for the current prompt, models and request parameters; changing any starts a fresh cache"""
+    signature = '|'.join([
+        config['prompt_cache_key'],
+        *(str(config[k]) for k in ('temperature', 'top_p', 'max_tokens')),
+        *(f"{m['name']}:{_json_dumps(m['thinking_params'])}" for m in config['models'])
+    ])
+    digest = hashlib.blake2b(signature.encode()).hexdigest()[:16]
+    return os.path.join(RESUME_CACHE_DIR, f"{RESUME_CACHE_PREFIX}{digest}.jsonl")
+
+
+def question_fingerprints(questions_df: pd.DataFrame) -> Dict[Any, str]:
+    """Map questionid -> hash of the whole question row, one vectorized pass over the frame"""
+    row_hashes = pd.util.hash_pandas_object(questions_df, index=False)
+    return {qid: format(h, 'x') for qid, h in zip(questions_df['questionid'], row_hashes.tolist())}
+
+
+def load_resume_cache(cache_path: str, fingerprints: Dict[Any, str]) -> Tuple[Dict, List[Tuple[List, List]]]:
     """
-    print("\n🎨 DASHBOARD: Starting build_and_write_dashboard()...")
+    Read a resume cache; a torn last line is skipped.
+    Entries whose question row no longer matches its fingerprint (edited or out of range) are ignored.
+
+    Returns:
+        ({questionid: {model_key: result}}, [(batch questionids, API_METRICS rows), ...])
+    """
+    cached_results = {}
+    cached_metrics = []
+    if not os.path.exists(cache_path):
+        return cached_results, cached_metrics
+    with open(cache_path, 'rb') as f:
+        for line in f:
+            try:
+                entry = _json_loads(line)
+            except ValueError:
+                continue
+            if 'metrics' in entry:
+                cached_metrics.append((entry['qids'], entry['metrics']))
+                continue
+            if entry.get('fp') != fingerprints.get(entry['qid']):
+                continue
+            cached_results.setdefault(entry['qid'], {}).update(entry['models'])
+    return cached_results, cached_metrics
+
+
+def append_resume_cache(cache_path: str, batch_results: Dict, fingerprints: Dict[Any, str],
+                        batch_qids: List, metrics_rows: List[Tuple]) -> None:
+    """
+    Append one JSON line per question with its row fingerprint and successful model results,
+    plus one line with the batch's API_METRICS rows so a resumed run still counts their tokens,
+    cost and time (raw responses are dropped from both).
+    """
+    raw_idx = METRICS_COLS.index('Raw_Response')
+    lines = [_json_dumps({'qids': batch_qids, 'metrics': [row[:raw_idx] + ('',) + row[raw_idx + 1:] for row in metrics_rows]})]
+    for qid, models in batch_results.items():
+        successful = {
+            model_key: {k: v for k, v in result.items() if k != 'raw_response'}
+            for model_key, result in models.items() if result.get('error') is None
+        }
+        if successful:
+            lines.append(_json_dumps({'qid': qid, 'fp': fingerprints.get(qid), 'models': successful}))
+    with open(cache_path, 'a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def delete_resume_caches(cache_path: Optional[str] = None) -> int:
+    """Remove the given resume cache file, or every one when cache_path is None; returns how many were deleted"""
+    if cache_path is not None:
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+            return 1
+        return 0
+    deleted = 0
+    if os.path.isdir(RESUME_CACHE_DIR):
+        for file_name in os.listdir(RESUME_CACHE_DIR):
+            if file_name.startswith(RESUME_CACHE_PREFIX):
+                os.remove(os.path.join(RESUME_CACHE_DIR, file_name))
+                deleted += 1
+    return deleted
+
+
+# ==================== DASHBOARD HELPER (Not @script - callable from main) ====================
 
+def _dashboard_number_format(metric_name: str) -> Optional[str]:
+    """Excel number format for a dashboard metric row, or None to leave it unformatted"""
+    if '%' in metric_name:
+        return '0.00%'
+    if 'Tokens' in metric_name or 'Items' in metric_name or 'Calls' in metric_name:
+        return '#,##0'
+    if 'Cost' in metric_name:
+        return '#,##0.0000'
+    return None
+
+
+def build_dashboard_df(book: xw.Book, config: Dict, metrics_df: pd.DataFrame, results_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Compute the complete DASHBOARD table in memory: metric rows per model plus the
+    Total column, parameter rows and descriptions. Reads T_COST; writes nothing.
+    Returns None when there are no metrics.
+    """
     METRIC_DESCRIPTIONS = {
         "Thinking": "Shows thinking/reasoning parameters if enabled for the model. Budget for Gemini, Effort for OpenAI.",
         "Max Tokens": "Maximum number of tokens the model is allowed to generate in its response.",
@@ -863,255 +1508,466 @@ def build_and_write_dashboard(book: xw.Book, config: Dict, metrics_data: List[Di
         "Failed Items": "Number of questions for which the API call or response parsing failed.",
         "Changes Recommended": "Count of questions where the model indicated 'change_required' was 1.",
         "Change Rate (%)": "Percentage of successful items where changes were recommended. (Changes Recommended / Successful Items)",
-        "Total Time": "Total time spent on all API calls for the model (HH:MM:SS). Sum of 'Latency_Seconds' from API_METRICS.",
-        "Time per Question": "Average time taken to process a single question. (Total Time / Total Items)",
-        "Time per API Call": "Average latency for a single API call. (Total Time / Total API Calls)",
+        "Total API Time": "Summed duration of all API calls for the model (HH:MM:SS). Sum of 'Latency_Seconds' from API_METRICS. Calls run concurrently (up to MAX_CONCURRENCY batches at once), so this is not elapsed time.",
+        "API Time per Question": "Summed API time per question. (Total API Time / Total Items). Not elapsed time when batches run concurrently.",
+        "Time per API Call": "Average latency for a single API call. (Total API Time / Total API Calls)",
         "Total Input Tokens": "Sum of all input tokens used for this model. Actual value from API response.",
         "Total Output Tokens": "Sum of all output tokens generated by this model. Actual value from API response.",
         "Total Reasoning Tokens": "Sum of all reasoning/thinking tokens used. Billed at output rate. Actual value from API response.",
         "Total Tokens": "Sum of Input, Output, and Reasoning tokens.",
-        "System Prompt Tokens (Est.)": "Estimated tokens for the complete system prompt loaded from PROMPT sheet. Calculated as (number of characters / 4).",
+        "System Prompt Tokens (Est.)": "Estimated tokens for the complete system prompt loaded from PROMPT sheet. Counted once per run with tiktoken (gpt-4o encoding), or estimated as (number of characters / 4) if tiktoken is unavailable.",
         "Total System Prompt Tokens (Est.)": "Estimated total tokens used by the system prompt across all calls. (System Prompt Tokens) * Total API Calls",
         "Prompt Share of Input (%)": "The percentage of total input tokens that were used by the system prompt.",
-        "Input Cost": "Total cost for input tokens. Calculated as (Total Input Tokens / 1,000,000) * Input Price from T_COST.",
+        "Total Cache Read Tokens": "Input tokens served from the provider's prompt cache (part of Total Input Tokens). Actual value from API response.",
+        "Total Cache Write Tokens": "Input tokens written to the provider's prompt cache (part of Total Input Tokens). Actual value from API response.",
+        "Input Cost": "Total cost for input tokens: uncached input at the Input Price, cache reads at CACHE_READ and cache writes at CACHE_WRITE from T_COST (per 1M tokens). Where T_COST has no cache price the Input Price is used, so the cost is an upper bound.",
         "Output Cost": "Total cost for output tokens. Calculated as (Total Output Tokens / 1,000,000) * Output Price from T_COST.",
         "Reasoning Cost": "Total cost for reasoning tokens. Billed at output price. (Total Reasoning Tokens / 1,000,000) * Output Price from T_COST.",
         "Total Cost": "Sum of Input, Output, and Reasoning costs.",
         "Cost per 1K Questions (USD)": "Projected cost to process 1,000 questions based on the current run's average cost per question.",
         "Cost per 100K Questions (USD)": "Projected cost to process 100,000 questions based on the current run's average cost per question.",
-        "Total Time per 100K Questions": "Projected time to process 100,000 questions based on the current run's average time per question."
+        "API Time per 100K Questions": "Projected summed API time for 100,000 questions based on the current run's API time per question. Elapsed time is roughly this divided by the number of batches in flight (MAX_CONCURRENCY)."
     }
-    
-    try:
-        # --- Initial Setup and Calculations ---
-        cost_sheet, cost_table = find_table_in_workbook(book, "T_COST")
-        cost_lookup = {}
-        if cost_table:
-            cost_df = cost_table.range.options(pd.DataFrame, index=False).value
-            cost_df.columns = [str(c).upper() for c in cost_df.columns]
 
-            if cost_df['MODEL'].duplicated().any():
-                print("   ⚠️  DASHBOARD: T_COST has duplicate model names. Keeping first occurrence only.")
-                cost_df = cost_df.drop_duplicates(subset='MODEL', keep='first')
-
-            cost_df.set_index('MODEL', inplace=True)
-            cost_lookup = cost_df.to_dict('index')
-            print("   ✅ DASHBOARD: T_COST table loaded.")
-        else:
-            print("   ⚠️  DASHBOARD: T_COST table not found. Cost calculations will be skipped.")
-
-        if not metrics_data:
-            print("   🔴 DASHBOARD: No metrics data provided, skipping.")
-            return
-
-        # Estimate system prompt tokens (1 token ≈ 4 characters)
-        system_prompt_tokens = round(len(system_prompt_text) / 4)
-        prompt_tokens_per_call = system_prompt_tokens
-
-        metrics_df = pd.DataFrame(metrics_data)
-        results_df = pd.DataFrame(results_data)
-        dashboard_data = []
-        active_models = metrics_df['Model_Key'].unique()
-
-        # --- Per-Model Calculation Loop ---
-        for model_key in active_models:
-            full_model_name = config[model_key]
-            display_model_name = get_short_model_name(full_model_name)
-            print(f"\n   📊 DASHBOARD: Processing {display_model_name}...")
-
-            model_metrics = metrics_df[metrics_df['Model_Key'] == model_key]
-            model_results = results_df[results_df['Model'] == display_model_name]
-
-            total_api_calls = len(model_metrics)
-            total_input_tokens = int(model_metrics['Input_Tokens'].sum())
-            total_output_tokens = int(model_metrics['Output_Tokens'].sum())
-            total_reasoning_tokens = int(model_metrics['Reasoning_Tokens'].sum())
-            total_prompt_tokens = prompt_tokens_per_call * total_api_calls
-            prompt_share_of_input = (total_prompt_tokens / total_input_tokens) if total_input_tokens > 0 else 0
-
-            model_costs = cost_lookup.get(config[model_key], {'INPUT': 0, 'OUTPUT': 0})
-            input_cost = (total_input_tokens / 1_000_000) * float(model_costs.get('INPUT', 0))
-            output_cost = (total_output_tokens / 1_000_000) * float(model_costs.get('OUTPUT', 0))
-            reasoning_cost = (total_reasoning_tokens / 1_000_000) * float(model_costs.get('OUTPUT', 0))
-            total_cost = input_cost + output_cost + reasoning_cost
-
-            successful_items = model_results['Change Required?'].notna().sum() / 3
-            changes_recommended = (model_results['Change Required?'] == 1).sum() / 3
-
-            total_time_seconds = model_metrics['Latency_Seconds'].sum()
-            batch_size = config['batch_size']
-            total_questions_processed = total_api_calls * batch_size
-            time_per_question_seconds = (total_time_seconds / total_questions_processed) if total_questions_processed > 0 else 0
-            time_per_api_call_seconds = (total_time_seconds / total_api_calls) if total_api_calls > 0 else 0
-
-            cost_per_1k = (total_cost / total_questions_processed * 1_000) if total_questions_processed > 0 else 0
-            cost_per_100k = (total_cost / total_questions_processed * 100_000) if total_questions_processed > 0 else 0
-            
-            time_per_100k_seconds = (total_time_seconds / total_questions_processed * 100_000) if total_questions_processed > 0 else 0
-            formatted_time_per_100k = format_time_hms(time_per_100k_seconds)
-
-            dashboard_data.append({
-                'Model': display_model_name,
-                'Total API Calls': total_api_calls,
-                'Successful API Calls': len(model_metrics[model_metrics['Status'] == 'SUCCESS']),
-                'Total Items': len(model_results) / 3,
-                'Successful Items': successful_items,
-                'Failed Items': (len(model_results) / 3) - successful_items,
-                'Changes Recommended': int(changes_recommended),
-                'Change Rate (%)': (changes_recommended / successful_items) if successful_items > 0 else 0,
-                'Total Time': format_time_hms(total_time_seconds),
-                'Time per Question': format_time_hms(time_per_question_seconds),
-                'Time per API Call': format_time_hms(time_per_api_call_seconds),
-                'Total Input Tokens': total_input_tokens,
-                'Total Output Tokens': total_output_tokens,
-                'Total Reasoning Tokens': total_reasoning_tokens,
-                'Total Tokens': total_input_tokens + total_output_tokens + total_reasoning_tokens,
-                'System Prompt Tokens (Est.)': system_prompt_tokens,
-                'Total System Prompt Tokens (Est.)': total_prompt_tokens,
-                'Prompt Share of Input (%)': prompt_share_of_input,
-                'Input Cost': input_cost,
-                'Output Cost': output_cost,
-                'Reasoning Cost': reasoning_cost,
-                'Total Cost': total_cost,
-                'Cost per 1K Questions (USD)': cost_per_1k,
-                'Cost per 100K Questions (USD)': cost_per_100k,
-                'Total Time per 100K Questions': formatted_time_per_100k
-            })
+    # --- Initial Setup and Calculations ---
+    cost_sheet, cost_table = find_table_in_workbook(book, "T_COST")
+    cost_lookup = {}
+    # Per-million token prices; CACHE_READ / CACHE_WRITE are optional T_COST columns
+    price_columns = ['INPUT', 'OUTPUT', 'CACHE_READ', 'CACHE_WRITE']
+    prices = pd.DataFrame(columns=price_columns, dtype=np.float64)
+    if cost_table:
+        cost_df = cost_table.range.options(pd.DataFrame, index=False).value
+        cost_df.columns = [str(c).upper() for c in cost_df.columns]
+
+        if cost_df['MODEL'].duplicated().any():
+            print("   ⚠️  DASHBOARD: T_COST has duplicate model names. Keeping first occurrence only.")
+            cost_df = cost_df.drop_duplicates(subset='MODEL', keep='first')
+
+        cost_df.set_index('MODEL', inplace=True)
+        cost_lookup = cost_df.to_dict('index')
+        price_cols = [c for c in price_columns if c in cost_df.columns]
+        prices = cost_df[price_cols].apply(pd.to_numeric, errors='coerce').reindex(columns=price_columns)
+        # No cache price for a model: bill its cached tokens at the full input price (upper bound)
+        for cache_col in ('CACHE_READ', 'CACHE_WRITE'):
+            prices[cache_col] = prices[cache_col].fillna(prices['INPUT'])
+        prices = prices.fillna(0).astype(np.float64)
+        print("   ✅ DASHBOARD: T_COST table loaded.")
+    else:
+        print("   ⚠️  DASHBOARD: T_COST table not found. Cost calculations will be skipped.")
+
+    if metrics_df.empty:
+        print("   🔴 DASHBOARD: No metrics data provided, skipping.")
+        return None
 
-        # --- Final DataFrame Assembly & Formatting ---
-        print("\n   ✅ DASHBOARD: Built all model rows.")
-        dashboard_df = pd.DataFrame(dashboard_data)
-
-        if not dashboard_df.empty:
-            total_row = {}
-            for col in dashboard_df.columns:
-                if col == 'Model':
-                    total_row[col] = 'Total'
-                elif dashboard_df[col].dtype in ['int64', 'float64']:
-                    total_row[col] = dashboard_df[col].sum()
-                else:
-                    if len(dashboard_df) > 0:
-                        total_row[col] = dashboard_df[col].iloc[0]
-                    else:
-                        total_row[col] = ''
+    # System prompt tokens are counted once at config load (tiktoken, or chars / 4 fallback)
+    system_prompt_tokens = config.get('system_prompt_tokens') or round(len(config.get('system_prompt', '')) / 4)
+    prompt_tokens_per_call = system_prompt_tokens
+
+    dashboard_data = []
+    active_models = metrics_df['Model_Key'].unique()
+
+    # --- Aggregate all models in one pass per table ---
+    # API_METRICS sheets written before the cache columns existed read back without them
+    cache_cols = {col: 0 for col in ('Cache_Read_Tokens', 'Cache_Write_Tokens') if col not in metrics_df.columns}
+    metrics_agg = metrics_df.assign(_success=metrics_df['Status'].eq('SUCCESS'), **cache_cols).groupby('Model_Key').agg(
+        Input_Tokens=('Input_Tokens', 'sum'),
+        Cache_Read_Tokens=('Cache_Read_Tokens', 'sum'),
+        Cache_Write_Tokens=('Cache_Write_Tokens', 'sum'),
+        Output_Tokens=('Output_Tokens', 'sum'),
+        Reasoning_Tokens=('Reasoning_Tokens', 'sum'),
+        Latency_Seconds=('Latency_Seconds', 'sum'),
+        Total_API_Calls=('Status', 'size'),
+        Successful_API_Calls=('_success', 'sum')
+    )
+
+    # Each question contributes 3 result rows per model (Original / Rewrite / Issues)
+    if 'Model' in results_df.columns:
+        change_col = results_df['Change Required?']
+        results_agg = results_df.assign(_has_result=change_col.notna(), _changed=change_col.eq(1)).groupby('Model').agg(
+            Rows=('Model', 'size'),
+            Successful_Rows=('_has_result', 'sum'),
+            Changed_Rows=('_changed', 'sum')
+        )
+    else:
+        results_agg = pd.DataFrame(columns=['Rows', 'Successful_Rows', 'Changed_Rows'])
+    no_results = pd.Series({'Rows': 0, 'Successful_Rows': 0, 'Changed_Rows': 0})
+
+    # --- Costs for all models at once: token totals (millions) x per-token-type prices ---
+    # Input_Tokens includes cached tokens, so the uncached part is billed at INPUT and the
+    # cache reads / writes at their own rates.
+    # Reasoning tokens are billed at the output price. Models missing from T_COST cost 0.
+    model_prices = prices.reindex([config[mk] for mk in active_models]).fillna(0).to_numpy(dtype=np.float64)
+    input_m, read_m, write_m, output_m, reasoning_m = (metrics_agg.loc[active_models, [
+        'Input_Tokens', 'Cache_Read_Tokens', 'Cache_Write_Tokens', 'Output_Tokens', 'Reasoning_Tokens'
+    ]].to_numpy(dtype=np.float64) / 1_000_000).T
+    uncached_m = np.clip(input_m - read_m - write_m, 0, None)
+    token_millions = np.column_stack([uncached_m, read_m, write_m, output_m, reasoning_m])
+    # Price columns: INPUT=0, OUTPUT=1, CACHE_READ=2, CACHE_WRITE=3 (reasoning billed at output)
+    model_costs = np.multiply(token_millions, model_prices[:, [0, 2, 3, 1, 1]])
+
+    # --- Per-Model Calculation Loop ---
+    for model_idx, model_key in enumerate(active_models):
+        full_model_name = config[model_key]
+        display_model_name = get_short_model_name(full_model_name)
+        print(f"\n   📊 DASHBOARD: Processing {display_model_name}...")
+
+        model_metrics = metrics_agg.loc[model_key]
+        model_results = results_agg.loc[display_model_name] if display_model_name in results_agg.index else no_results
+
+        total_api_calls = int(model_metrics['Total_API_Calls'])
+        total_input_tokens = int(model_metrics['Input_Tokens'])
+        total_output_tokens = int(model_metrics['Output_Tokens'])
+        total_reasoning_tokens = int(model_metrics['Reasoning_Tokens'])
+        total_prompt_tokens = prompt_tokens_per_call * total_api_calls
+        prompt_share_of_input = (total_prompt_tokens / total_input_tokens) if total_input_tokens > 0 else 0
+
+        uncached_cost, cache_read_cost, cache_write_cost, output_cost, reasoning_cost = (float(c) for c in model_costs[model_idx])
+        input_cost = uncached_cost + cache_read_cost + cache_write_cost
+        total_cost = input_cost + output_cost + reasoning_cost
+
+        total_items = model_results['Rows'] / 3
+        successful_items = model_results['Successful_Rows'] / 3
+        changes_recommended = model_results['Changed_Rows'] / 3
+
+        # Summed call latencies: with concurrent batches this exceeds the run's elapsed time
+        total_time_seconds = model_metrics['Latency_Seconds']
+        # Calls may carry different numbers of questions when auto-tuning, so count items
+        total_questions_processed = total_items
+        time_per_question_seconds = (total_time_seconds / total_questions_processed) if total_questions_processed > 0 else 0
+        time_per_api_call_seconds = (total_time_seconds / total_api_calls) if total_api_calls > 0 else 0
+
+        cost_per_1k = (total_cost / total_questions_processed * 1_000) if total_questions_processed > 0 else 0
+        cost_per_100k = (total_cost / total_questions_processed * 100_000) if total_questions_processed > 0 else 0
+        
+        time_per_100k_seconds = (total_time_seconds / total_questions_processed * 100_000) if total_questions_processed > 0 else 0
+        formatted_time_per_100k = format_time_hms(time_per_100k_seconds)
+
+        dashboard_data.append({
+            'Model': display_model_name,
+            'Total API Calls': total_api_calls,
+            'Successful API Calls': int(model_metrics['Successful_API_Calls']),
+            'Total Items': total_items,
+            'Successful Items': successful_items,
+            'Failed Items': total_items - successful_items,
+            'Changes Recommended': int(changes_recommended),
+            'Change Rate (%)': (changes_recommended / successful_items) if successful_items > 0 else 0,
+            'Total API Time': format_time_hms(total_time_seconds),
+            'API Time per Question': format_time_hms(time_per_question_seconds),
+            'Time per API Call': format_time_hms(time_per_api_call_seconds),
+            'Total Input Tokens': total_input_tokens,
+            'Total Cache Read Tokens': int(model_metrics['Cache_Read_Tokens']),
+            'Total Cache Write Tokens': int(model_metrics['Cache_Write_Tokens']),
+            'Total Output Tokens': total_output_tokens,
+            'Total Reasoning Tokens': total_reasoning_tokens,
+            'Total Tokens': total_input_tokens + total_output_tokens + total_reasoning_tokens,
+            'System Prompt Tokens (Est.)': system_prompt_tokens,
+            'Total System Prompt Tokens (Est.)': total_prompt_tokens,
+            'Prompt Share of Input (%)': prompt_share_of_input,
+            'Input Cost': input_cost,
+            'Output Cost': output_cost,
+            'Reasoning Cost': reasoning_cost,
+            'Total Cost': total_cost,
+            'Cost per 1K Questions (USD)': cost_per_1k,
+            'Cost per 100K Questions (USD)': cost_per_100k,
+            'API Time per 100K Questions': formatted_time_per_100k
+        })
+
+    # --- Final DataFrame Assembly & Formatting ---
+    print("\n   ✅ DASHBOARD: Built all model rows.")
+    dashboard_df = pd.DataFrame(dashboard_data)
+
+    if not dashboard_df.empty:
+        # One vectorized sum over the numeric columns; non-numeric ones (time strings) copy the first model
+        numeric_cols = dashboard_df.select_dtypes(include='number').columns
+        column_sums = dashboard_df[numeric_cols].sum()
+        first_row = dashboard_df.iloc[0]
+        total_row = {col: column_sums[col] if col in numeric_cols else first_row[col] for col in dashboard_df.columns}
+        total_row['Model'] = 'Total'
+
+        dashboard_df.loc[len(dashboard_df)] = total_row
+        dashboard_df = dashboard_df.set_index('Model').T.reset_index().rename(columns={'index': 'Metric'})
+        
+        # Add the Description column
+        dashboard_df['Description'] = dashboard_df['Metric'].map(METRIC_DESCRIPTIONS).fillna('')
+        print("   ✅ DASHBOARD: Added 'Description' column.")
 
-            dashboard_df = pd.concat([dashboard_df, pd.DataFrame([total_row])], ignore_index=True)
-            dashboard_df = dashboard_df.set_index('Model').T.reset_index().rename(columns={'index': 'Metric'})
-            
-            # Add the Description column
-            dashboard_df['Description'] = dashboard_df['Metric'].map(METRIC_DESCRIPTIONS).fillna('')
-            print("   ✅ DASHBOARD: Added 'Description' column.")
+        thinking_row = {'Metric': 'Thinking', 'Description': METRIC_DESCRIPTIONS.get('Thinking', '')}
 
-            thinking_row = {'Metric': 'Thinking', 'Description': METRIC_DESCRIPTIONS.get('Thinking', '')}
+        # Short display name (column header) -> full model name; first configured model wins on a tie
+        short_to_full = {}
+        for mk in ('model_1', 'model_2', 'model_3'):
+            short_to_full.setdefault(get_short_model_name(config[mk]), config[mk])
 
-            for col in dashboard_df.columns:
-                if col in ['Metric', 'Description']:
-                    continue
-                if col == 'Total':
-                    thinking_row[col] = ''
-                else:
-                    # Find the full model name corresponding to the short display name (column header)
-                    full_model_name = next((config[mk] for mk in ['model_1', 'model_2', 'model_3'] if get_short_model_name(config[mk]) == col), None)
-                    if full_model_name:
-                        model_cost_info = cost_lookup.get(full_model_name, {})
-                        is_thinking_model = model_cost_info.get('THINKING') == 1
-
-                        if is_thinking_model:
-                            if full_model_name.startswith('google/'):
-                                budget_val = config.get('thinking_budget_gemini')
-                                if budget_val is None or str(budget_val).strip() == '':
-                                    thinking_row[col] = 'Off (Blank)'
-                                else:
-                                    thinking_row[col] = f"Budget: {budget_val}"
-                            elif full_model_name.startswith('openai/'):
-                                effort_val = config.get('reasoning_effort_openai')
-                                if effort_val is None or str(effort_val).strip() == '':
-                                    thinking_row[col] = 'Effort: minimal (Default)'
-                                else:
-                                    thinking_row[col] = f"Effort: {effort_val}"
+        for col in dashboard_df.columns:
+            if col in ['Metric', 'Description']:
+                continue
+            if col == 'Total':
+                thinking_row[col] = ''
+            else:
+                full_model_name = short_to_full.get(col)
+                if full_model_name:
+                    model_cost_info = cost_lookup.get(full_model_name, {})
+                    is_thinking_model = model_cost_info.get('THINKING') == 1
+
+                    if is_thinking_model:
+                        if full_model_name.startswith('google/'):
+                            budget_val = config.get('thinking_budget_gemini')
+                            if budget_val is None or str(budget_val).strip() == '':
+                                thinking_row[col] = 'Off (Blank)'
                             else:
-                                thinking_row[col] = 'Yes' # Fallback
+                                thinking_row[col] = f"Budget: {budget_val}"
+                        elif full_model_name.startswith('openai/'):
+                            effort_val = config.get('reasoning_effort_openai')
+                            if effort_val is None or str(effort_val).strip() == '':
+                                thinking_row[col] = 'Effort: minimal (Default)'
+                            else:
+                                thinking_row[col] = f"Effort: {effort_val}"
                         else:
-                            thinking_row[col] = 'N/A'
+                            thinking_row[col] = 'Yes' # Fallback
                     else:
                         thinking_row[col] = 'N/A'
+                else:
+                    thinking_row[col] = 'N/A'
+
+        # Add Max Tokens, Temperature and Top P rows (same value for every model, none for Total)
+        model_cols = [col for col in dashboard_df.columns if col not in ['Metric', 'Description', 'Total']]
+        parameter_rows = [thinking_row]
+        for metric_name, config_key in [('Max Tokens', 'max_tokens'), ('Temperature', 'temperature'), ('Top P', 'top_p')]:
+            parameter_rows.append({
+                'Metric': metric_name, 'Description': METRIC_DESCRIPTIONS.get(metric_name, ''),
+                **{col: config[config_key] for col in model_cols}
+            })
 
-            thinking_df = pd.DataFrame([thinking_row])
-            
-            # Add Max Tokens row
-            max_tokens_row = {'Metric': 'Max Tokens', 'Description': METRIC_DESCRIPTIONS.get('Max Tokens', '')}
-            for col in dashboard_df.columns:
-                if col in ['Metric', 'Description', 'Total']: continue
-                max_tokens_row[col] = config['max_tokens']
-            max_tokens_df = pd.DataFrame([max_tokens_row])
-
-            # Add Temperature row
-            temperature_row = {'Metric': 'Temperature', 'Description': METRIC_DESCRIPTIONS.get('Temperature', '')}
-            for col in dashboard_df.columns:
-                if col in ['Metric', 'Description', 'Total']: continue
-                temperature_row[col] = config['temperature']
-            temperature_df = pd.DataFrame([temperature_row])
-
-            # Add Top P row
-            top_p_row = {'Metric': 'Top P', 'Description': METRIC_DESCRIPTIONS.get('Top P', '')}
-            for col in dashboard_df.columns:
-                if col in ['Metric', 'Description', 'Total']: continue
-                top_p_row[col] = config['top_p']
-            top_p_df = pd.DataFrame([top_p_row])
-
-            dashboard_df = pd.concat([thinking_df, max_tokens_df, temperature_df, top_p_df, dashboard_df], ignore_index=True)
-            print("   ✅ DASHBOARD: Added 'Thinking', 'Max Tokens', 'Temperature', and 'Top P' parameter rows.")
-
-            # Reorder columns to place Description last
-            cols = dashboard_df.columns.tolist()
-            if 'Description' in cols:
-                cols.append(cols.pop(cols.index('Description')))
-                dashboard_df = dashboard_df[cols]
-                print("   ✅ DASHBOARD: Reordered columns to place 'Description' last.")
-
-        if 'DASHBOARD' in [s.name for s in book.sheets]:
-            book.sheets['DASHBOARD'].delete()
-        dashboard_sheet = book.sheets.add('DASHBOARD')
-
-        dashboard_sheet['A1'].options(pd.DataFrame, index=False).value = dashboard_df
-        print(f"   ✅ DASHBOARD: Written {len(dashboard_df)} rows to sheet.")
-
-        num_cols = len(dashboard_df.columns)
-        header_range = dashboard_sheet.range('A1').resize(1, num_cols)
-        header_range.color = '#4472C4'
-        header_range.font.color = '#FFFFFF'
-        header_range.font.bold = True
-
-        for row_idx in range(len(dashboard_df)):
-            metric_name = str(dashboard_df.iloc[row_idx]['Metric'])
-            excel_row = row_idx + 2
-            # Format numeric columns, skipping Metric (col A) and Description (last col)
-            format_range = dashboard_sheet.range(f"B{excel_row}").resize(1, num_cols - 2)
-
-            if '%' in metric_name:
-                format_range.number_format = '0.00%'
-            elif 'Tokens' in metric_name or 'Items' in metric_name or 'Calls' in metric_name:
-                format_range.number_format = '#,##0'
-            elif 'Cost' in metric_name:
-                format_range.number_format = '#,##0.0000'
-
-        table_range = dashboard_sheet.range('A1').resize(len(dashboard_df) + 1, num_cols)
-        try:
-            dashboard_sheet.tables.add(source=table_range)
-            print("   ✅ DASHBOARD: Table formatting applied.")
-        except Exception as table_error:
-            print(f"   ⚠️  DASHBOARD: Could not create table - {table_error}")
+        # All parameter rows go in as one frame: a single concat
+        dashboard_df = pd.concat([pd.DataFrame(parameter_rows), dashboard_df], ignore_index=True)
+        print("   ✅ DASHBOARD: Added 'Thinking', 'Max Tokens', 'Temperature', and 'Top P' parameter rows.")
 
+        # Reorder columns to place Description last
+        cols = dashboard_df.columns.tolist()
+        if 'Description' in cols:
+            cols.append(cols.pop(cols.index('Description')))
+            dashboard_df = dashboard_df[cols]
+            print("   ✅ DASHBOARD: Reordered columns to place 'Description' last.")
+
+    return dashboard_df
+
+
+def write_dashboard_sheet(book: xw.Book, dashboard_df: pd.DataFrame, sheets_by_name: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Replace the DASHBOARD sheet with a finished dashboard table.
+
+    A fixed handful of Excel calls regardless of size: one bulk value write, header
+    styling, one number_format per run of like-formatted rows, and the table.
+    """
+    if sheets_by_name is None:
+        sheets_by_name = index_sheets(book)
+    # Deleted and re-added rather than cleared, so the previous run's table goes too
+    if 'DASHBOARD' in sheets_by_name:
+        sheets_by_name.pop('DASHBOARD').delete()
+    dashboard_sheet = book.sheets.add('DASHBOARD')
+    sheets_by_name['DASHBOARD'] = dashboard_sheet
+
+    dashboard_sheet['A1'].options(pd.DataFrame, index=False).value = dashboard_df
+    print(f"   ✅ DASHBOARD: Written {len(dashboard_df)} rows to sheet.")
+
+    num_cols = len(dashboard_df.columns)
+    header_range = dashboard_sheet.range('A1').resize(1, num_cols)
+    header_range.color = '#4472C4'
+    header_range.font.color = '#FFFFFF'
+    header_range.font.bold = True
+
+    # Format numeric columns, skipping Metric (col A) and Description (last col).
+    # One number_format call per run of consecutive rows sharing a format, not one per row.
+    row_formats = [_dashboard_number_format(str(m)) for m in dashboard_df['Metric']]
+    excel_row = 2
+    for number_format, run in groupby(row_formats):
+        run_length = len(list(run))
+        if number_format:
+            dashboard_sheet.range(f"B{excel_row}").resize(run_length, num_cols - 2).number_format = number_format
+        excel_row += run_length
+
+    table_range = dashboard_sheet.range('A1').resize(len(dashboard_df) + 1, num_cols)
+    try:
+        dashboard_sheet.tables.add(source=table_range)
+        print("   ✅ DASHBOARD: Table formatting applied.")
+    except Exception as table_error:
+        print(f"   ⚠️  DASHBOARD: Could not create table - {table_error}")
+
+
+def build_and_write_dashboard(book: xw.Book, config: Dict, metrics_df: pd.DataFrame, results_df: pd.DataFrame,
+                              sheets_by_name: Optional[Dict[str, Any]] = None):
+    """
+    Builds and writes an enhanced dashboard with prompt cost analysis and metric descriptions.
+
+    Takes the API_METRICS and ASSESSMENT_RESULTS tables as DataFrames, whether freshly
+    built by assess_questions or read back from the sheets by refresh_dashboard.
+    sheets_by_name is the caller's index_sheets() map (kept up to date here), to avoid rescanning book.sheets.
+    """
+    print("\n🎨 DASHBOARD: Starting build_and_write_dashboard()...")
+
+    try:
+        # The whole table is built in memory first, then written in one pass
+        dashboard_df = build_dashboard_df(book, config, metrics_df, results_df)
+        if dashboard_df is None:
+            return
+        write_dashboard_sheet(book, dashboard_df, sheets_by_name)
         print("   ✅ DASHBOARD: Successfully created and formatted!")
 
     except Exception as e:
         print(f"   🔴 DASHBOARD: Error - {e}")
-        import traceback
         traceback.print_exc()
 
 
 # ==================== MAIN ASSESSMENT SCRIPT ====================
 
+# Fixed ASSESSMENT_RESULTS schema: rows are built as tuples in this order
+FEEDBACK_ITEMS = ('question',) + ANSWER_JSON_KEYS
+RESULT_COLS = ('Model', 'questionid', 'Item', 'Change Required?', 'Question') + ANSWER_DISPLAY_KEYS
+_SEPARATOR_ROW = (None,) * len(RESULT_COLS)  # Blank line between model blocks
+# Result tuples are turned into a DataFrame chunk every this many rows and the chunks
+# concatenated once, so the full tuple list never coexists with the finished frame
+RESULT_FRAME_ROWS = 5_000
+
+# API_METRICS schema: one value list per column, appended once per batch per model
+METRICS_COLS = (
+    'Timestamp', 'Question_ID', 'Model_Name', 'Model_Key', 'Status',
+    'Input_Tokens', 'Output_Tokens', 'Reasoning_Tokens', 'Total_Tokens', 'Cache_Read_Tokens', 'Cache_Write_Tokens',
+    'Latency_Seconds', 'Raw_Response', 'Error_Message'
+)
+
+def batch_metrics_rows(batch_num: int, batch_df: pd.DataFrame, batch_results: Dict, completed_at: datetime,
+                       models: List[Dict]) -> List[Tuple]:
+    """
+    API_METRICS rows (METRICS_COLS order) for one batch: one per model, from its result for the
+    batch's first question (every question in a batch shares the same API call).
+    """
+    rows = []
+    batch_ts = completed_at.strftime('%Y-%m-%d %H:%M:%S')
+    first_q_results = batch_results.get(batch_df['questionid'].iloc[0], {})
+    for model_cfg in models:
+        model_key = model_cfg['key']
+        result = first_q_results.get(model_key)
+        if not result:
+            continue
+        tokens = result.get('tokens') or {}
+        error = result.get('error')
+        raw_response = result.get('raw_response')
+        rows.append((
+            batch_ts,
+            f"Batch_{batch_num}",
+            result.get('model_name'), model_key,
+            'SUCCESS' if error is None else 'ERROR',
+            tokens.get('input', 0),
+            tokens.get('output', 0),
+            tokens.get('reasoning', 0),
+            tokens.get('total', 0),
+            tokens.get('cache_read', 0),
+            tokens.get('cache_write', 0),
+            round(result.get('latency', 0), 2),
+            _json_dumps(raw_response) if raw_response else '',
+            error or ''
+        ))
+    return rows
+
+
+# Office.js caps the size of a single request (~5MB on Excel for the web). Row sizes vary
+# widely (API_METRICS Raw_Response cells run to 20-100KB, ASSESSMENT_RESULTS rows a few KB),
+# so blocks are cut by accumulated text size, leaving headroom for multi-byte characters and
+# JSON escaping; WRITE_BLOCK_ROWS also caps narrow rows. Small frames are still a single write.
+WRITE_BLOCK_CHARS = 3_000_000
+WRITE_BLOCK_ROWS = 2_000
+
+
+def _write_blocks(data: List[List]) -> List[Tuple[int, int]]:
+    """(start, end) row slices of data, each under WRITE_BLOCK_CHARS of cell text and WRITE_BLOCK_ROWS rows"""
+    blocks = []
+    block_start = 0
+    block_chars = 0
+    for i, row in enumerate(data):
+        row_chars = sum(len(str(v)) + 4 for v in row if v is not None)  # +4: per-cell quoting/separator overhead
+        if i > block_start and (block_chars + row_chars > WRITE_BLOCK_CHARS or i - block_start >= WRITE_BLOCK_ROWS):
+            blocks.append((block_start, i))
+            block_start, block_chars = i, 0
+        block_chars += row_chars
+    blocks.append((block_start, len(data)))
+    return blocks
+
+
+def write_df_to_sheet(book: xw.Book, sheet_name: str, df: pd.DataFrame, sheets_by_name: Dict[str, Any]) -> bool:
+    """
+    Replace a sheet's contents with a DataFrame in one bulk write (size-bounded blocks if huge, see _write_blocks).
+
+    Rows are accumulated in Python during the run and written here once per sheet,
+    never cell by cell. The frame goes out as a plain 2D list (header + rows, NaN ->
+    blank) into a range sized exactly to it, skipping the DataFrame converter. The
+    explicit size matters: a 2D list anchored at a single cell is unstable in xlwings Lite.
+    sheets_by_name is the caller's index_sheets() map; a newly added sheet is recorded in it.
+    Returns False (sheet left untouched) when df is empty.
+    """
+    if df.empty:
+        return False
+    sheet = ensure_sheet(book, sheet_name, sheets_by_name)
+    data = [list(df.columns)] + df.astype(object).where(df.notna(), None).values.tolist()
+    for block_start, block_end in _write_blocks(data):
+        sheet[f'A{block_start + 1}'].resize(block_end - block_start, len(df.columns)).value = data[block_start:block_end]
+    return True
+
+
+# Last worksheet row in Excel; end('up') from here finds a column's last filled cell
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def read_sheet_rows(sheet: xw.Sheet, n_cols: int) -> List[List]:
+    """
+    Read a sheet written by write_df_to_sheet (header + rows from A1) in one rectangular read.
+
+    Extent comes from a single end('up') probe on column A instead of expand('right').expand('down'),
+    which needs two probes and stops at the first blank row (ASSESSMENT_RESULTS has one between
+    model blocks). used_range would do this in one call but is not supported in xlwings Lite.
+    n_cols is the known column count of the sheet (len(METRICS_COLS) / len(RESULT_COLS)).
+    """
+    last_row = sheet[f'A{EXCEL_MAX_ROWS}'].end('up').row
+    return sheet['A1'].resize(last_row, n_cols).options(ndim=2).value
+
+
+# Excel holds at most 32,767 characters per cell; long text is split into rows below this
+CELL_TEXT_LIMIT = 30_000
+# A cell starting with one of these is read as a formula ('=', '+', '-', '@') or loses its
+# first character (a leading "'" marks text), so no chunk may begin with them
+_UNSAFE_CELL_START = frozenset("=+-@'")
+
+
+def split_text_for_cells(text: str, max_chars: int = CELL_TEXT_LIMIT) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, one per cell down a column.
+
+    Chunks break after a newline where possible, so with indented JSON each cell
+    starts with whitespace or a bracket. A line longer than max_chars (e.g. base64
+    image data in a question) is hard-split, moving each split point back until the
+    next piece does not start with a character in _UNSAFE_CELL_START. Joining the
+    cells in order gives back the original text exactly.
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for line in text.splitlines(keepends=True):
+        if current and current_len + len(line) > max_chars:
+            chunks.append(''.join(current))
+            current, current_len = [], 0
+        # A single line longer than the limit is hard-split where the next piece starts safely
+        while len(line) > max_chars:
+            cut = max_chars
+            while cut > max_chars // 2 and line[cut] in _UNSAFE_CELL_START:
+                cut -= 1
+            chunks.append(line[:cut])
+            line = line[cut:]
+        current.append(line)
+        current_len += len(line)
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
 def _create_judge_json_output(all_results: Dict, original_questions_df: pd.DataFrame) -> List[Dict]:
     """
     Transforms the raw assessment results into a structured JSON format for a judge LLM.
@@ -1126,17 +1982,27 @@ def _create_judge_json_output(all_results: Dict, original_questions_df: pd.DataF
     print("   Creating judge-friendly JSON payload...")
     judge_payload = []
     
-    # Create a lookup for original questions by questionid for efficiency
-    originals_lookup = original_questions_df.set_index('questionid').to_dict('index')
+    # Create a lookup for original questions by questionid, pulling only the columns we read
+    wanted_cols = ('questionid', 'question') + ANSWER_JSON_KEYS
+    cols = [c for c in wanted_cols if c in original_questions_df.columns]
+    originals_lookup = {t.questionid: t for t in original_questions_df[cols].itertuples(index=False)}
 
     # Iterate through each question that was assessed
     for qid, models_assessment in all_results.items():
         
         # Get original question data
         original_data = originals_lookup.get(qid)
-        if not original_data:
+        if original_data is None:
             continue # Skip if original question not found
 
+        # Original text is the same for every model, so clean it and drop empty answers once per question
+        original_question = _clean_text(getattr(original_data, 'question', ''))
+        original_answers = []
+        for answer_key in ANSWER_JSON_KEYS:
+            answer_val = getattr(original_data, answer_key, None)
+            if pd.notna(answer_val) and answer_val != '':
+                original_answers.append((answer_key, _clean_text(answer_val)))
+
         # Iterate through each model's assessment for that question
         for model_key, result in models_assessment.items():
             if result.get('error'):
@@ -1146,23 +2012,20 @@ def _create_judge_json_output(all_results: Dict, original_questions_df: pd.DataF
             
             # Construct the answers array
             answers_list = []
-            for i in range(1, 6): # Assuming max 5 answers
-                answer_key = f'answer{i}'
-                # Check if the answer exists in the original data and is not null/empty
-                if answer_key in original_data and pd.notna(original_data[answer_key]) and original_data[answer_key] != '':
-                    answer_feedback = feedback.get(answer_key, {})
-                    answers_list.append({
-                        "answer_id": answer_key,
-                        "original_answer": _clean_text(original_data.get(answer_key, "")),
-                        "rewrite": answer_feedback.get('rewrite', ""),
-                        "reason": answer_feedback.get('issue', "")
-                    })
+            for answer_key, original_answer in original_answers:
+                answer_feedback = feedback.get(answer_key, {})
+                answers_list.append({
+                    "answer_id": answer_key,
+                    "original_answer": original_answer,
+                    "rewrite": answer_feedback.get('rewrite', ""),
+                    "reason": answer_feedback.get('issue', "")
+                })
 
             # Build the final JSON object for this assessment
             judge_item = {
                 "question_id": qid,
                 "assessing_model": result.get('model_name', 'unknown'),
-                "original_question": _clean_text(original_data.get('question', '')),
+                "original_question": original_question,
                 "question_rewrite": feedback.get('question', {}).get('rewrite', ''),
                 "question_reason": feedback.get('question', {}).get('issue', ''),
                 "answers": answers_list
@@ -1173,7 +2036,7 @@ def _create_judge_json_output(all_results: Dict, original_questions_df: pd.DataF
 
 
 @script
-def assess_questions(book: xw.Book):
+async def assess_questions(book: xw.Book):
     """
     Main script to assess questions using 3 LLMs via OpenRouter in batches.
     """
@@ -1216,6 +2079,12 @@ def assess_questions(book: xw.Book):
         else:
             print("   ⚠️  T_COST table not found. Thinking parameters will not be applied.")
 
+        # Resolve enabled models once so per-call code does no lookups
+        config['models'] = resolve_model_configs(config, thinking_models_lookup, thinking_values_lookup)
+
+        # Fail fast on auth/prompt errors before launching any batches
+        await preflight_check(config)
+
         # Step 3: Load questions table
         print("📊 Loading questions from T_QUESTIONS table...")
         source_sheet, questions_table = find_table_in_workbook(book, "T_QUESTIONS")
@@ -1242,146 +2111,211 @@ def assess_questions(book: xw.Book):
         df_to_process = df_all.iloc[start_idx:end_idx].copy()
         print(f"📌 Processing {len(df_to_process)} questions (rows {start_idx + 2} to {end_idx + 1})\n")
 
+        # Resume (RESUME = 1 only): skip questions every enabled model already assessed in an earlier, interrupted run
+        enabled_model_keys = {m['key'] for m in config['models']}
+        if config['resume']:
+            cache_path = resume_cache_path(config)
+            fingerprints = question_fingerprints(df_to_process)
+            cached_results, cached_metrics = load_resume_cache(cache_path, fingerprints)
+        else:
+            cache_path, fingerprints, cached_results, cached_metrics = None, {}, {}, []
+        completed_qids = {qid for qid, models in cached_results.items() if enabled_model_keys <= models.keys()}
+        df_pending = df_to_process[~df_to_process['questionid'].isin(completed_qids)]
+        if config['resume']:
+            print(f"♻️  RESUME is on: reusing cached results for {len(df_to_process) - len(df_pending)} of {len(df_to_process)} questions, "
+                  f"{len(df_pending)} to assess (set RESUME to 0 to re-assess everything)\n")
+
         # Step 5: Prepare results storage
-        api_metrics_data = []
-        results_data = []
-        all_batch_results = {} # To aggregate results for the judge JSON
+        api_metrics_cols = {col: [] for col in METRICS_COLS}  # Columnar: the DataFrame is built straight from these lists
+        # Restore the API calls behind resumed questions, so the dashboard's per-question cost and time include them
+        for batch_qids, metrics_rows in cached_metrics:
+            if completed_qids.intersection(batch_qids):
+                for metrics_row in metrics_rows:
+                    for col, value in zip(METRICS_COLS, metrics_row):
+                        api_metrics_cols[col].append(value)
+        results_rows = []  # Tuples in RESULT_COLS order, flushed to results_frames every RESULT_FRAME_ROWS
+        results_frames = []
+        # To aggregate results for the judge JSON, seeded with the resumed questions
+        all_batch_results = {qid: cached_results[qid] for qid in df_to_process['questionid'] if qid in completed_qids}
         
-        batch_size = config['batch_size']
-        total_batches = (len(df_to_process) + batch_size - 1) // batch_size
-
-        # Step 6: Process questions in batches
-        for i in range(total_batches):
-            batch_start_index = i * batch_size
-            batch_end_index = batch_start_index + batch_size
-            batch_df = df_to_process.iloc[batch_start_index:batch_end_index]
+        llm_batch_size = config['llm_batch_size']
+        batch_latencies = []  # Slowest model latency per batch, for auto-tuning
+        batch_outputs = []    # (batch_num, batch_results, metrics_rows) in completion order
+        semaphore = asyncio.Semaphore(config['max_concurrency'])
+        batch_tasks = []
+
+        async def run_batch(batch_num: int, batch_df: pd.DataFrame, total_batches: int, first_row: int, last_row: int):
+            """Assess one batch while holding a concurrency slot; Excel is not touched here."""
+            nonlocal llm_batch_size
+            batch_started = time.time()
+            try:
+                print(f"\n{'='*80}")
+                print(f"📦 Processing Batch {batch_num}/{total_batches} | Questions {first_row}-{last_row}")
+                print(f"{'='*80}")
+
+                # Pass batch number for detailed logging on first batch
+                batch_results = await assess_question_batch(batch_df, config, batch_num=batch_num)
+                metrics_rows = batch_metrics_rows(batch_num, batch_df, batch_results, datetime.now(), config['models'])
+                batch_outputs.append((batch_num, batch_results, metrics_rows))
+                if cache_path:
+                    try:
+                        append_resume_cache(cache_path, batch_results, fingerprints, batch_df['questionid'].tolist(), metrics_rows)
+                    except Exception as e:
+                        # The cache only speeds up re-runs; losing it must not lose this run's results
+                        print(f"   ⚠️  Batch {batch_num}: could not save to resume cache ({e}) - continuing")
+
+                batch_model_results = batch_results.get(batch_df['questionid'].iloc[0], {}).values()
+                if batch_model_results:
+                    batch_latencies.append(max(r.get('latency', 0) for r in batch_model_results))
+                llm_batch_size = tune_llm_batch_size(llm_batch_size, batch_latencies, config)
+
+                # Keep the slot during the delay so each slot stays paced for the provider's RPM.
+                # The delay is measured from batch start, so API time counts toward it: a batch
+                # slower than the delay starts the next one immediately (max(api, delay), not api + delay).
+                remaining_delay = config['request_delay_seconds'] - (time.time() - batch_started)
+                if remaining_delay > 0 and batch_start_index < len(df_pending):
+                    await asyncio.sleep(remaining_delay)
+            finally:
+                semaphore.release()
+
+        # Step 6: Dispatch batches, keeping up to MAX_CONCURRENCY in flight. Each batch is sliced
+        # only when a slot frees up, so a batch size reduced by auto-tuning applies immediately.
+        print(f"⚡ Running up to {config['max_concurrency']} batches concurrently")
+        batch_start_index = 0
+        i = 0
+        while batch_start_index < len(df_pending):
+            await semaphore.acquire()
+
+            # Stop dispatching if a batch hit a fatal (configuration) error
+            if any(t.done() and not t.cancelled() and t.exception() for t in batch_tasks):
+                semaphore.release()
+                break
+
+            batch_end_index = batch_start_index + llm_batch_size
+            batch_df = df_pending.iloc[batch_start_index:batch_end_index]
+            remaining_after = max(0, len(df_pending) - batch_end_index)
+            total_batches = i + 1 + (remaining_after + llm_batch_size - 1) // llm_batch_size
+
+            # Sheet row = DataFrame index + 2 (header row); still correct when resumed rows are skipped
+            batch_tasks.append(asyncio.create_task(run_batch(
+                i + 1, batch_df, total_batches, batch_df.index[0] + 2, batch_df.index[-1] + 2
+            )))
+            batch_start_index = batch_end_index
+            i += 1
 
-            print(f"\n{'='*80}")
-            print(f"📦 Processing Batch {i+1}/{total_batches} | Questions {batch_start_index+start_idx+2}-{min(batch_end_index+start_idx+1, end_idx+1)}")
-            print(f"{'='*80}")
+        try:
+            await asyncio.gather(*batch_tasks)
+        except Exception:
+            for t in batch_tasks:
+                t.cancel()
+            raise
 
-            # Pass batch number for detailed logging on first batch
-            batch_assessment_results = assess_question_batch(batch_df, config, thinking_models_lookup, thinking_values_lookup, batch_num=(i+1))
-            
+        # Collect outputs in batch order (batches complete out of order when run concurrently)
+        for batch_num, batch_assessment_results, metrics_rows in sorted(batch_outputs, key=lambda b: b[0]):
             # Aggregate results for the final judge JSON
             all_batch_results.update(batch_assessment_results)
 
-            # Process results for each question in the batch for standard output
-            for _, row in batch_df.iterrows():
-                question_id = row['questionid']
-                assessment_for_question = batch_assessment_results.get(question_id, {})
-
-                original_content = {'Question': _clean_text(row.get('question', ''))}
-                for ans_idx in range(1, 6):
-                    original_content[f'Answer {ans_idx}'] = _clean_text(row.get(f'answer{ans_idx}', ''))
-
-                for model_key in ['model_1', 'model_2', 'model_3']:
-                    if config.get(f'{model_key}_tag') != 1: continue
-
-                    model_result = assessment_for_question.get(model_key, {})
-                    full_model_name = config[model_key]
-                    display_model_name = get_short_model_name(full_model_name)
-                    change_required_val = model_result.get('change_required')
-
-                    feedback = model_result.get('feedback', {})
-                    results_data.append({'Model': display_model_name, 'questionid': question_id, 'Item': 'Original', 'Change Required?': change_required_val, **original_content})
-                    results_data.append({
-                        'Model': display_model_name, 'questionid': question_id, 'Item': 'Rewrite', 'Change Required?': change_required_val,
-                        'Question': feedback.get('question', {}).get('rewrite', ''),
-                        **{f'Answer {j}': feedback.get(f'answer{j}', {}).get('rewrite', '') for j in range(1, 6)}
-                    })
-                    results_data.append({
-                        'Model': display_model_name, 'questionid': question_id, 'Item': 'Issues', 'Change Required?': change_required_val,
-                        'Question': feedback.get('question', {}).get('issue', model_result.get('error', '')),
-                        **{f'Answer {j}': feedback.get(f'answer{j}', {}).get('issue', '') for j in range(1, 6)}
-                    })
-                    results_data.append({}) # Separator row
-            
-            # Log API metrics ONCE per batch, per model
-            for model_key in ['model_1', 'model_2', 'model_3']:
-                if config.get(f'{model_key}_tag') != 1: continue
-                
-                first_qid_in_batch = batch_df['questionid'].iloc[0]
-                model_result_for_first_q = batch_assessment_results.get(first_qid_in_batch, {}).get(model_key)
-
-                if model_result_for_first_q:
-                    api_metrics_data.append({
-                        'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'Question_ID': f"Batch_{i+1}",
-                        'Model_Name': model_result_for_first_q.get('model_name'), 'Model_Key': model_key,
-                        'Status': 'SUCCESS' if model_result_for_first_q.get('error') is None else 'ERROR',
-                        'Input_Tokens': model_result_for_first_q.get('tokens', {}).get('input', 0),
-                        'Output_Tokens': model_result_for_first_q.get('tokens', {}).get('output', 0),
-                        'Reasoning_Tokens': model_result_for_first_q.get('tokens', {}).get('reasoning', 0),
-                        'Total_Tokens': model_result_for_first_q.get('tokens', {}).get('total', 0),
-                        'Latency_Seconds': round(model_result_for_first_q.get('latency', 0), 2),
-                        'Raw_Response': model_result_for_first_q.get('raw_response', '') or '',
-                        'Error_Message': model_result_for_first_q.get('error', '') or ''
-                    })
-            
-            if config['request_delay_seconds'] > 0 and (i+1) < total_batches:
-                print(f"\n...Pausing for {config['request_delay_seconds']} seconds before next batch...")
-                time.sleep(config['request_delay_seconds'])
+            # API metrics ONCE per batch, per model (rows built in run_batch, see batch_metrics_rows)
+            for metrics_row in metrics_rows:
+                for col, value in zip(METRICS_COLS, metrics_row):
+                    api_metrics_cols[col].append(value)
+
+        # Process results for each question in the range (resumed and new) for standard output
+        for _, row in df_to_process.iterrows():
+            question_id = row['questionid']
+            assessment_for_question = all_batch_results.get(question_id, {})
+
+            original_texts = tuple(_clean_text(row.get(item, '')) for item in FEEDBACK_ITEMS)
+
+            for model_cfg in config['models']:
+                model_result = assessment_for_question.get(model_cfg['key'], {})
+                display_model_name = model_cfg['short_name']
+                change_required_val = model_result.get('change_required')
+
+                feedback = model_result.get('feedback', {})
+                item_feedback = [feedback.get(item, {}) for item in FEEDBACK_ITEMS]
+                row_prefix = (display_model_name, question_id)
+                results_rows.append((*row_prefix, 'Original', change_required_val, *original_texts))
+                results_rows.append((*row_prefix, 'Rewrite', change_required_val, *(f.get('rewrite', '') for f in item_feedback)))
+                results_rows.append((
+                    *row_prefix, 'Issues', change_required_val,
+                    item_feedback[0].get('issue', model_result.get('error', '')), *(f.get('issue', '') for f in item_feedback[1:])
+                ))
+                results_rows.append(_SEPARATOR_ROW)
+
+            if len(results_rows) >= RESULT_FRAME_ROWS:
+                results_frames.append(pd.DataFrame.from_records(results_rows, columns=RESULT_COLS))
+                results_rows.clear()
+
+        if results_rows or not results_frames:
+            results_frames.append(pd.DataFrame.from_records(results_rows, columns=RESULT_COLS))
+            results_rows.clear()
+        results_df = results_frames[0] if len(results_frames) == 1 else pd.concat(results_frames, ignore_index=True)
+        del results_frames
+
+        # Keep this run's resume cache while any question still lacks a successful result from every model
+        if cache_path:
+            if all(enabled_model_keys <= {k for k, r in all_batch_results.get(qid, {}).items() if r.get('error') is None}
+                   for qid in df_to_process['questionid']):
+                delete_resume_caches(cache_path)
+            else:
+                print(f"   ℹ️  Some questions failed; re-run with RESUME = 1 to retry only those (cache: {cache_path})")
 
         # Step 7: Write standard results and dashboard
         print(f"\n{'='*80}")
         print("💾 Writing results to ASSESSMENT_RESULTS sheet...")
-        if 'ASSESSMENT_RESULTS' in [s.name for s in book.sheets]:
-            book.sheets['ASSESSMENT_RESULTS'].clear()
-        results_sheet = book.sheets['ASSESSMENT_RESULTS'] if 'ASSESSMENT_RESULTS' in [s.name for s in book.sheets] else book.sheets.add('ASSESSMENT_RESULTS')
-        results_df = pd.DataFrame(results_data)
-        if results_df.empty:
-            print("   ⚠️  No results were generated. Skipping write to ASSESSMENT_RESULTS sheet.")
-        else:
-            results_sheet['A1'].options(pd.DataFrame, index=False).value = results_df
+        sheets_by_name = index_sheets(book)  # Scanned once for all writes below
+        if write_df_to_sheet(book, 'ASSESSMENT_RESULTS', results_df, sheets_by_name):
             print(f"✅ Results written: {len(results_df)} rows")
+        else:
+            print("   ⚠️  No results were generated. Skipping write to ASSESSMENT_RESULTS sheet.")
 
         print("📈 Writing API metrics...")
-        if 'API_METRICS' in [s.name for s in book.sheets]:
-            book.sheets['API_METRICS'].clear()
-        metrics_sheet = book.sheets['API_METRICS'] if 'API_METRICS' in [s.name for s in book.sheets] else book.sheets.add('API_METRICS')
-        metrics_df = pd.DataFrame(api_metrics_data)
-        if metrics_df.empty:
-            print("   ⚠️  No API metrics were generated. Skipping write to API_METRICS sheet.")
-        else:
-            metrics_sheet['A1'].options(pd.DataFrame, index=False).value = metrics_df
+        metrics_df = pd.DataFrame(api_metrics_cols)
+        if write_df_to_sheet(book, 'API_METRICS', metrics_df, sheets_by_name):
             print(f"✅ API metrics written: {len(metrics_df)} records")
+        else:
+            print("   ⚠️  No API metrics were generated. Skipping write to API_METRICS sheet.")
 
-        # Step 8: Generate and write the new Judge JSON output
-        print("\n⚖️ Generating JSON output for Judge LLM...")
-        try:
-            judge_json_data = _create_judge_json_output(all_batch_results, df_to_process)
+        # Step 8: Generate and write the new Judge JSON output (nothing to encode if no batch succeeded)
+        if not all_batch_results:
+            print("\n   ⚠️  No assessment results - skipping Judge JSON output.")
+        else:
+            print("\n⚖️ Generating JSON output for Judge LLM...")
+            try:
+                judge_json_data = _create_judge_json_output(all_batch_results, df_to_process)
+        
+                if judge_json_data:
+                    sheet_name = "LLM_JUDGE_INPUT"
+                    judge_sheet = ensure_sheet(book, sheet_name, sheets_by_name)
+            
+                    json_string = _json_dumps_indented(judge_json_data)
+                    # One cell can't hold a multi-MB string: write it down column A in <=30K-char pieces
+                    chunks = split_text_for_cells(json_string)
+                    judge_sheet['A1'].resize(len(chunks), 1).value = [[chunk] for chunk in chunks]
             
-            if judge_json_data:
-                sheet_name = "LLM_JUDGE_INPUT"
-                if sheet_name in [s.name for s in book.sheets]:
-                    judge_sheet = book.sheets[sheet_name]
-                    judge_sheet.clear()
+                    print(f"✅ Successfully generated {len(judge_json_data)} records for the judge.")
+                    if len(chunks) == 1:
+                        print(f"📄 Output written to '{sheet_name}' sheet, cell A1.")
+                    else:
+                        print(f"📄 Output written to '{sheet_name}' sheet, cells A1:A{len(chunks)} ({len(json_string):,} chars) - join them in order.")
                 else:
-                    judge_sheet = book.sheets.add(sheet_name)
-                
-                json_string = json.dumps(judge_json_data, indent=2)
-                judge_sheet['A1'].value = json_string
-                
-                print(f"✅ Successfully generated {len(judge_json_data)} records for the judge.")
-                print(f"📄 Output written to '{sheet_name}' sheet, cell A1.")
-            else:
-                print("   ⚠️  No valid assessment data to generate Judge JSON.")
+                    print("   ⚠️  No valid assessment data to generate Judge JSON.")
 
-        except Exception as e:
-            print(f"❌ Error generating Judge JSON output: {e}")
-            import traceback
-            traceback.print_exc()
+            except Exception as e:
+                print(f"❌ Error generating Judge JSON output: {e}")
+                traceback.print_exc()
 
         print("\n🎨 Building dashboard...")
-        build_and_write_dashboard(book, config, api_metrics_data, results_data, config['system_prompt'])
+        build_and_write_dashboard(book, config, metrics_df, results_df, sheets_by_name)
 
         total_time_secs = time.time() - overall_start_time
         print(f"\n{'='*80}\n✅ ASSESSMENT COMPLETE! Total Time: {int(total_time_secs // 60)}m {int(total_time_secs % 60)}s\n{'='*80}")
     except Exception as e:
         print(f"\n❌ FATAL ERROR in assess_questions: {e}")
-        import traceback
         traceback.print_exc()
+    finally:
+        await _close_async_client()
 
 
 # ==================== REFRESH DASHBOARD (Simplified helper) ====================
@@ -1397,49 +2331,38 @@ def refresh_dashboard(book: xw.Book):
     
     try:
         config = load_config(book)
+        sheets_by_name = index_sheets(book)
         
-        if 'API_METRICS' not in [s.name for s in book.sheets]:
+        if 'API_METRICS' not in sheets_by_name:
             print("❌ API_METRICS sheet not found - cannot refresh dashboard")
             return
         
-        metrics_sheet = book.sheets['API_METRICS']
+        metrics_sheet = sheets_by_name['API_METRICS']
         
         # Read the metrics sheet with explicit range
         try:
-            # Get all data from API_METRICS - read all rows, columns A-K
-            metrics_range = metrics_sheet['A1'].expand('right').expand('down')
-            all_data = metrics_range.value
+            all_data = read_sheet_rows(metrics_sheet, len(METRICS_COLS))
             
-            # Convert to list of dicts, skipping header row
+            # Header row becomes the DataFrame columns
             if all_data and len(all_data) > 1:
-                headers = all_data[0]
-                metrics_data = []
-                for row in all_data[1:]:
-                    row_dict = {headers[i]: row[i] for i in range(len(headers))}
-                    metrics_data.append(row_dict)
-                
-                print(f"✅ Read {len(metrics_data)} metrics records from sheet")
+                metrics_df = pd.DataFrame(all_data[1:], columns=all_data[0])
+                print(f"✅ Read {len(metrics_df)} metrics records from sheet")
                 
                 # Try to read results too
-                results_data = []
-                if 'ASSESSMENT_RESULTS' in [s.name for s in book.sheets]:
-                    results_sheet = book.sheets['ASSESSMENT_RESULTS']
-                    results_range = results_sheet['A1'].expand('right').expand('down')
-                    results_all = results_range.value
+                results_df = pd.DataFrame()
+                if 'ASSESSMENT_RESULTS' in sheets_by_name:
+                    results_sheet = sheets_by_name['ASSESSMENT_RESULTS']
+                    results_all = read_sheet_rows(results_sheet, len(RESULT_COLS))
                     if results_all and len(results_all) > 1:
-                        headers = results_all[0]
-                        for row in results_all[1:]:
-                            row_dict = {headers[i]: row[i] for i in range(len(headers))}
-                            results_data.append(row_dict)
-                        print(f"✅ Read {len(results_data)} results records from sheet")
+                        results_df = pd.DataFrame(results_all[1:], columns=results_all[0])
+                        print(f"✅ Read {len(results_df)} results records from sheet")
                 
                 # Build dashboard with the data
-                build_and_write_dashboard(book, config, metrics_data, results_data, config['system_prompt'])
+                build_and_write_dashboard(book, config, metrics_df, results_df, sheets_by_name)
             else:
                 print("❌ No data in API_METRICS sheet")
         except Exception as e:
             print(f"❌ Error reading metrics: {e}")
-            import traceback
             traceback.print_exc()
             
     except Exception as e:
@@ -1454,10 +2377,13 @@ def clear_all_results(book: xw.Book):
     """Clear all result sheets"""
     print("\n🧹 Clearing results...")
     try:
+        sheets_by_name = index_sheets(book)
         for sheet_name in ['ASSESSMENT_RESULTS', 'API_METRICS', 'DASHBOARD']:
-            if sheet_name in [s.name for s in book.sheets]:
-                book.sheets[sheet_name].delete()
+            if sheet_name in sheets_by_name:
+                sheets_by_name[sheet_name].delete()
                 print(f"   ✅ Deleted {sheet_name}")
+        if delete_resume_caches():
+            print("   ✅ Deleted resume cache")
         print("\n✅ All cleared")
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -1468,13 +2394,14 @@ def get_manual_test_payload(book: xw.Book):
     """
     Generate JSON payload for manual testing in AI Studio or Gemini Playground.
 
-    Outputs ONLY the FIRST BATCH (5 questions) to MANUAL_TEST_JSON sheet cell A1.
+    Outputs ONLY the FIRST BATCH (QUESTIONS_PER_CALL questions) to MANUAL_TEST_JSON sheet,
+    cell A1 (or A1:An in <=30K-char pieces if it exceeds Excel's per-cell limit).
     This ensures exact consistency between manual testing and automation.
 
     Usage:
     1. Set START_ROW and END_ROW in MASTER sheet
     2. Run this function
-    3. Copy JSON from MANUAL_TEST_JSON sheet A1
+    3. Copy JSON from MANUAL_TEST_JSON sheet A1 (joining A1:An in order if split)
     4. Paste into AI Studio prompt box (system instructions already configured separately)
     5. Test with different temperature/thinking settings
     6. Once satisfied, update MASTER sheet and run assess_questions() for automation
@@ -1494,16 +2421,21 @@ def get_manual_test_payload(book: xw.Book):
         if not questions_table:
             raise ValueError("T_QUESTIONS table not found!")
 
-        questions_df = questions_table.range.options(pd.DataFrame, index=False).value
+        # Only the header and the first batch's rows are read, not the whole table
+        table_range = questions_table.range
+        total_data_rows = table_range.shape[0] - 1
+        header = table_range.resize(1).value
 
         # Calculate first batch range
         start_row = config['start_row']
-        end_row = config['end_row'] if config['end_row'] else len(questions_df) + 1
-        batch_size = config['batch_size']
+        end_row = config['end_row'] if config['end_row'] else total_data_rows + 1
+        batch_size = config['llm_batch_size']
 
-        # Get first batch only
+        # Get first batch only (sheet row N is table data row N - 2, below the header)
         batch_end_row = min(start_row + batch_size - 1, end_row)
-        first_batch_df = questions_df.iloc[start_row - 2:batch_end_row - 1]
+        n_rows = max(0, min(batch_end_row, total_data_rows + 1) - start_row + 1)
+        batch_values = table_range.offset(row_offset=start_row - 1).resize(n_rows).options(ndim=2).value if n_rows else []
+        first_batch_df = pd.DataFrame(batch_values, columns=header)
 
         print(f"   Processing questions {start_row} to {batch_end_row}")
         print(f"   Batch size: {len(first_batch_df)} questions")
@@ -1521,20 +2453,20 @@ def get_manual_test_payload(book: xw.Book):
         json_payload = prepare_question_batch_payload(first_batch_df)
 
         # Create or clear MANUAL_TEST_JSON sheet
-        if 'MANUAL_TEST_JSON' in [s.name for s in book.sheets]:
-            test_sheet = book.sheets['MANUAL_TEST_JSON']
-            test_sheet.clear()
-        else:
-            test_sheet = book.sheets.add('MANUAL_TEST_JSON')
+        test_sheet = ensure_sheet(book, 'MANUAL_TEST_JSON', index_sheets(book))
 
-        # Write JSON to A1
-        test_sheet['A1'].value = json_payload
+        # One cell holds at most 32,767 chars: write down column A in <=30K-char pieces
+        chunks = split_text_for_cells(json_payload)
+        test_sheet['A1'].resize(len(chunks), 1).value = [[chunk] for chunk in chunks]
 
         # Note: column_width and row_height are not supported in xlwings Lite
         # Users can manually adjust column width if needed
 
         print(f"\n✅ JSON payload generated successfully!")
-        print(f"📄 Output location: MANUAL_TEST_JSON sheet, cell A1")
+        if len(chunks) == 1:
+            print(f"📄 Output location: MANUAL_TEST_JSON sheet, cell A1")
+        else:
+            print(f"📄 Output location: MANUAL_TEST_JSON sheet, cells A1:A{len(chunks)} ({len(json_payload):,} chars) - join them in order")
         print(f"📋 Questions included: {len(first_batch_df)}")
         print(f"\n📖 NEXT STEPS:")
         print(f"   1. Go to MANUAL_TEST_JSON sheet")
@@ -1552,7 +2484,6 @@ def get_manual_test_payload(book: xw.Book):
 
     except Exception as e:
         print(f"\n❌ ERROR generating manual test payload: {e}")
-        import traceback
         traceback.print_exc()
 
 